@@ -3,6 +3,11 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+To serve it with Gunicorn managing Uvicorn workers, opt in to the settings
+in ``gunicorn_asgi.conf.py`` (which also lists what changes under ASGI):
+
+    gunicorn core.asgi:application -c gunicorn_asgi.conf.py
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
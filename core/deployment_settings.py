@@ -34,19 +34,61 @@ STORAGES = {
     'raw_media': {
         'BACKEND': 'django.core.files.storage.FileSystemStorage',
     },
+    'staging': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': os.environ.get('STAGING_ROOT', BASE_DIR / 'staging')},
+    },
     'staticfiles': {
         'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
     },
 }
 
+# Background tasks (image processing, copying CVs to their storage, rollup
+# recounts) are queued for `python manage.py run_tasks`, which must run
+# alongside the web process and share STAGING_ROOT with it. Set
+# TASKS_ALWAYS_EAGER=true to run them in the web process after commit instead
+TASKS_ALWAYS_EAGER = os.environ.get('TASKS_ALWAYS_EAGER', 'false').lower() in ('1', 'true', 'yes')
+
+# Let a fronting proxy send media files when one is configured
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT') or None
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', MEDIA_ACCEL_PREFIX)
+
+# Connection reuse. By default each worker thread keeps its connection open
+# for DB_CONN_MAX_AGE seconds, checking it is still usable before reuse, so
+# requests no longer pay for a TLS handshake with Postgres. Setting
+# DB_POOL=true switches to Django's native psycopg 3 connection pool
+# instead, which requires CONN_MAX_AGE = 0.
+DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+
 DATABASES = {
     'default': dj_database_url.config(
         default=os.environ.get('DATABASE_URL'), 
-        conn_max_age=0,
+        conn_max_age=0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        conn_health_checks=True,
         ssl_require=True
     )
 }
 
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # Validate connections handed out by the pool, like CONN_HEALTH_CHECKS
+        'check': ConnectionPool.check_connection,
+    }
+
+# Share the response cache between workers when a Redis instance is available
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+
 import cloudinary
 if 'CLOUDINARY_URL' in os.environ:
     INSTALLED_APPS += ['cloudinary', 'cloudinary_storage']
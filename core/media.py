@@ -0,0 +1,146 @@
+"""
+Production delivery of user uploaded media (CVs, logos, job images).
+
+With ``MEDIA_ACCEL_REDIRECT`` set, Django only checks the path and hands the
+transfer to the fronting proxy: ``'x-accel-redirect'`` for nginx (requests
+are redirected to ``MEDIA_ACCEL_PREFIX``, which must be an ``internal``
+location aliased to ``MEDIA_ROOT``) or ``'x-sendfile'`` for Apache/lighttpd.
+
+Without a proxy, whole files are returned as a ``FileResponse`` so the WSGI
+server can use its sendfile wrapper, single byte ranges are honoured, and
+every response carries validators plus a long-lived ``Cache-Control`` so
+clients revalidate or skip repeat downloads entirely. Files under
+``MEDIA_PRIVATE_PREFIXES`` (CVs) hold personal data and are marked
+``private, no-store`` instead, so no shared or browser cache keeps them.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+RANGE_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _byte_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header,
+    ``None`` when the header should be ignored, or ``False`` when the range
+    cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: serving the full file is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _is_private(relative_path):
+    return relative_path.startswith(tuple(getattr(settings, 'MEDIA_PRIVATE_PREFIXES', ('cvs/',))))
+
+
+def _set_cache_headers(response, etag, last_modified, private):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if private:
+        response['Cache-Control'] = 'private, no-store'
+    else:
+        response['Cache-Control'] = f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 2592000)}"
+    return response
+
+
+@require_safe
+def serve(request, path, document_root=None):
+    document_root = document_root or settings.MEDIA_ROOT
+    try:
+        fullpath = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found.')
+    try:
+        file_stat = os.stat(fullpath)
+    except OSError:
+        raise Http404('File not found.')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('File not found.')
+
+    # Checked on the resolved path, so "logos/../cvs/..." is private too
+    private = _is_private(os.path.relpath(fullpath, document_root).replace(os.sep, '/'))
+    size = file_stat.st_size
+    last_modified = int(file_stat.st_mtime)
+    etag = quote_etag(f'{file_stat.st_mtime_ns:x}-{size:x}')
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _set_cache_headers(not_modified, etag, last_modified, private)
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    accel = (getattr(settings, 'MEDIA_ACCEL_REDIRECT', None) or '').lower()
+    if accel:
+        response = HttpResponse(content_type=content_type)
+        if accel == 'x-accel-redirect':
+            prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix + quote(path)
+        elif accel == 'x-sendfile':
+            response['X-Sendfile'] = fullpath
+        else:
+            raise ValueError(f'Unsupported MEDIA_ACCEL_REDIRECT: {accel!r}')
+        return _set_cache_headers(response, etag, last_modified, private)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # A stale If-Range validator means the client wants the whole new file
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _byte_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_range(fullpath, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return _set_cache_headers(response, etag, last_modified, private)
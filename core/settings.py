@@ -71,7 +71,7 @@ AUTH_USER_MODEL = 'jobs.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'jobs.authentication.CachedJWTAuthentication',
     ),
 }
 
@@ -80,6 +80,50 @@ CORS_ALLOW_ALL_ORIGINS = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How core.media serves uploads when DEBUG is off: None streams them from
+# Django, 'x-accel-redirect' (nginx) or 'x-sendfile' hands them to the proxy
+MEDIA_ACCEL_REDIRECT = None
+# nginx internal location aliased to MEDIA_ROOT, used with X-Accel-Redirect
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# Seconds clients may cache a media file before revalidating
+MEDIA_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+# Media path prefixes holding personal data, which are never cached
+MEDIA_PRIVATE_PREFIXES = ('cvs/',)
+
+# Seconds between batched writes of buffered job view counts
+VIEW_COUNT_FLUSH_INTERVAL = 30
+
+# Run background tasks in-process after commit instead of queueing them for
+# the run_tasks worker, for development and tests; deployments queue them
+TASKS_ALWAYS_EAGER = True
+
+# Broker behind the event stream endpoints, and how many recent events it
+# keeps for reconnecting clients
+JOBS_EVENT_BROKER = 'jobs.events.InProcessBroker'
+JOBS_EVENT_BUFFER_SIZE = 1000
+# Cache holding the single-use event stream tickets; it must be shared by
+# all workers for a ticket to be redeemed on another worker
+JOBS_EVENT_TICKET_CACHE_ALIAS = 'default'
+
+# Limits of resumable CV uploads, in bytes
+CV_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+CV_UPLOAD_MAX_CHUNK_SIZE = 2 * 1024 * 1024
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Seconds a public job/shop response stays in the response cache, which is
+# only used when the cache is shared by all workers (see JOBS_SHARED_CACHES)
+JOBS_RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds an authenticated user (with their shop profile) stays cached. Only
+# used with a cache shared by all workers, such as Redis; JOBS_SHARED_CACHES
+# can list the aliases that are shared when the backend does not tell
+JOBS_AUTH_CACHE_TIMEOUT = 60
+
 
 ROOT_URLCONF = 'core.urls'
 
@@ -158,6 +202,11 @@ STORAGES = {
     'raw_media': {
         'BACKEND': 'django.core.files.storage.FileSystemStorage',
     },
+    # Uploads waiting for a background task; must be shared by web and worker
+    'staging': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': BASE_DIR / 'staging'},
+    },
     'staticfiles': {
         'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
     },
@@ -19,8 +19,14 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.views.static import serve
 
+from . import media
+
+# The development server keeps Django's static view; otherwise media is
+# served with range, caching and proxy offload support
+serve_media = serve if settings.DEBUG else media.serve
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('jobs.urls')),
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^media/(?P<path>.*)$', serve_media, {'document_root': settings.MEDIA_ROOT}),
 ]
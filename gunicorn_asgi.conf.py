@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for serving the ASGI application with Uvicorn
+workers. Gunicorn only reads it when asked to:
+
+    gunicorn core.asgi:application -c gunicorn_asgi.conf.py
+
+Plain ``gunicorn core.wsgi:application`` keeps serving WSGI with sync
+workers.
+
+Each worker runs an event loop, so the async endpoints under
+``/api/async/`` and ``/api/events/`` can serve many concurrent slow clients
+per process. The sync DRF views still work, but they share a single thread
+per worker and so run one at a time; scale with ``WEB_CONCURRENCY``. Under
+ASGI Django reads sync streaming responses completely into memory before
+sending them: the CSV/NDJSON applicant exports and media files served by
+``core.media`` lose their streaming, so keep them on a WSGI deployment.
+Set ``DB_POOL=True`` when serving this way: persistent connections
+(``CONN_MAX_AGE``) are not reused across async requests, a connection pool
+is.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
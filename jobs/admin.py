@@ -1,14 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment
+from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment, Task
 
 class ShopProfileAdmin(admin.ModelAdmin):
     list_display = ('company_name', 'user', 'is_verified', 'created_at')
     list_filter = ('is_verified',)
     list_editable = ('is_verified',)
 
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'finished_at')
+
 admin.site.register(User, UserAdmin)
 admin.site.register(ShopProfile, ShopProfileAdmin)
 admin.site.register(JobVacancy)
 admin.site.register(JobApplication)
 admin.site.register(VacancyComment)
+admin.site.register(Task, TaskAdmin)
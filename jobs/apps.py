@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class JobsConfig(AppConfig):
     name = 'jobs'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401 (registers the task handlers)
+        post_migrate.connect(signals.ensure_search_triggers, sender=self)
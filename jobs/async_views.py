@@ -0,0 +1,293 @@
+"""
+Async-native read endpoints for the public job and shop data, and the
+event stream.
+
+These mirror the DRF read endpoints but run directly on the event loop when
+the project is served over ASGI (see ``gunicorn_asgi.conf.py``), so slow clients
+do not each hold a worker thread. Queries go through Django's async ORM and
+results are rendered with the same serializers, which only touch data that
+has already been loaded.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import ParseError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import events, search
+from .counters import view_counter
+from .filters import VACANCY_ORDERINGS, filter_vacancies, vacancy_ordering
+from .models import JobVacancy, ShopProfile, User, VacancyComment
+from .serializers import (
+    JobVacancyCardSerializer, JobVacancySerializer, ShopProfileSerializer,
+    VacancyCommentSerializer, index_comment_replies
+)
+from .views import filter_near
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Seconds between SSE keep-alive comments, and the long-poll wait limits
+KEEPALIVE_SECONDS = 15
+POLL_TIMEOUT = 25
+MAX_POLL_TIMEOUT = 55
+
+
+def _error(detail, status=400):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def _page_size(params):
+    value = params.get('page_size', '')
+    if not value:
+        return PAGE_SIZE
+    if not value.isdigit() or int(value) < 1:
+        raise ParseError('page_size must be a positive integer.')
+    return min(int(value), MAX_PAGE_SIZE)
+
+
+def _encode_cursor(job):
+    raw = f'{job.created_at.isoformat()}|{job.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(value):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(value.encode()).decode().rsplit('|', 1)
+        moment = parse_datetime(created_at)
+        if moment is None:
+            raise ValueError
+        return moment, int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ParseError('Invalid cursor.')
+
+
+def _after_cursor(queryset, ordering, cursor):
+    # Keyset condition: rows strictly after (created_at, id) in list order
+    created_at, pk = _decode_cursor(cursor)
+    if ordering == VACANCY_ORDERINGS['-created_at']:
+        return queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+    return queryset.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=pk)
+
+
+def _page_url(request, **params):
+    query = request.GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+async def _comment_tree(job_id):
+    comments = [
+        comment async for comment in
+        VacancyComment.objects.filter(job_id=job_id).select_related('user').order_by('id').aiterator()
+    ]
+    return index_comment_replies(comments).get(job_id, [])
+
+
+@require_GET
+async def job_list(request):
+    """
+    Vacancy cards, filtered like ``/api/jobs/``. Paged by an opaque
+    ``?cursor=`` over (created_at, id); search (``?q=``) and distance
+    (``?near=``) results are ranked and paged with ``?offset=`` instead.
+    """
+    params = request.GET
+    queryset = JobVacancy.objects.select_related('shop')
+    try:
+        queryset = filter_vacancies(queryset, params)
+        size = _page_size(params)
+        ranked = bool(params.get('q') or params.get('near'))
+        if params.get('q'):
+            queryset = search.search_vacancies(queryset, params['q'])
+        if params.get('near'):
+            queryset = filter_near(queryset, params, prefix='shop__')
+
+        if ranked:
+            offset = params.get('offset', '0')
+            if not offset.isdigit():
+                raise ParseError('offset must be a non-negative integer.')
+            offset = int(offset)
+            window = queryset[offset:offset + size + 1]
+        else:
+            ordering = vacancy_ordering(params)
+            queryset = queryset.order_by(*ordering)
+            if params.get('cursor'):
+                queryset = _after_cursor(queryset, ordering, params['cursor'])
+            window = queryset[:size + 1]
+    except ParseError as exc:
+        return _error(exc.detail)
+
+    jobs = [job async for job in window.aiterator()]
+    next_url = None
+    if len(jobs) > size:
+        jobs = jobs[:size]
+        if ranked:
+            next_url = _page_url(request, offset=offset + size)
+        else:
+            next_url = _page_url(request, cursor=_encode_cursor(jobs[-1]))
+    return JsonResponse({'next': next_url, 'results': JobVacancyCardSerializer(jobs, many=True).data})
+
+
+@require_GET
+async def job_detail(request, pk):
+    try:
+        job = await JobVacancy.objects.select_related('shop__user').aget(pk=pk)
+    except JobVacancy.DoesNotExist:
+        return _error('Not found.', status=404)
+    job._comment_tree = await _comment_tree(job.pk)
+    await view_counter.aincrement(job.pk)
+    return JsonResponse(JobVacancySerializer(job).data)
+
+
+@require_GET
+async def job_comments(request, pk):
+    """Top-level comments of a vacancy with their replies nested below them."""
+    if not await JobVacancy.objects.filter(pk=pk).aexists():
+        return _error('Not found.', status=404)
+    comments = await _comment_tree(pk)
+    return JsonResponse(VacancyCommentSerializer(comments, many=True).data, safe=False)
+
+
+@require_GET
+async def shop_list(request):
+    queryset = ShopProfile.objects.select_related('user')
+    if request.GET.get('near'):
+        try:
+            queryset = filter_near(queryset, request.GET)
+        except ParseError as exc:
+            return _error(exc.detail)
+    shops = [shop async for shop in queryset.aiterator()]
+    return JsonResponse(ShopProfileSerializer(shops, many=True).data, safe=False)
+
+
+@require_GET
+async def shop_detail(request, pk):
+    try:
+        shop = await ShopProfile.objects.select_related('user').aget(pk=pk)
+    except ShopProfile.DoesNotExist:
+        return _error('Not found.', status=404)
+    return JsonResponse(ShopProfileSerializer(shop).data)
+
+
+async def _token_user_id(request):
+    """Authenticate with a JWT access token from the Authorization header."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    try:
+        # The claim is a string; events are addressed by primary key
+        return User._meta.pk.to_python(token.get(jwt_settings.USER_ID_CLAIM))
+    except ValidationError:
+        return None
+
+
+async def _event_user_id(request, ticket=False):
+    """
+    The id of the authenticated, active user. With ``ticket``, a stream
+    ticket from ``?ticket=`` is accepted as well as the Authorization header.
+    """
+    user_id = await _token_user_id(request)
+    if user_id is None and ticket and request.GET.get('ticket'):
+        user_id = await events.redeem_ticket(request.GET['ticket'])
+    if user_id is None or not await User.objects.filter(pk=user_id, is_active=True).aexists():
+        return None
+    return user_id
+
+
+def _event_id(value):
+    return int(value) if value and value.isdigit() else None
+
+
+def _sse(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+@csrf_exempt
+@require_POST
+async def event_ticket(request):
+    """
+    A single-use ticket for opening the event stream, which ``EventSource``
+    passes as ``?ticket=`` in place of the access token.
+    """
+    user_id = await _event_user_id(request)
+    if user_id is None:
+        return _error('Valid authentication credentials were not provided.', status=401)
+    return JsonResponse({'ticket': await events.issue_ticket(user_id), 'expires_in': events.TICKET_TIMEOUT})
+
+
+@require_GET
+async def event_stream(request):
+    """
+    Server-Sent Events of application and comment changes for the user,
+    authenticated by the Authorization header or a ``?ticket=`` from
+    ``event_ticket``. A ``reset`` event means events were missed; refetch
+    the lists.
+    """
+    # A WSGI worker would hold the never-ending stream until it is killed
+    if not isinstance(request, ASGIRequest):
+        return _error('The event stream needs an ASGI server; use /api/events/poll/ instead.', status=501)
+    user_id = await _event_user_id(request, ticket=True)
+    if user_id is None:
+        return _error('Valid authentication credentials were not provided.', status=401)
+    broker = events.get_broker()
+    after = _event_id(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+    if after is None:
+        after = broker.last_id
+
+    async def stream():
+        nonlocal after
+        yield 'retry: 3000\n\n'
+        while True:
+            batch, complete, last_id = await broker.wait(user_id, after, KEEPALIVE_SECONDS)
+            if not complete:
+                yield _sse(last_id, 'reset', {})
+            for event in batch:
+                yield _sse(event['id'], event['type'], event['data'])
+            if complete and not batch:
+                yield ': keepalive\n\n'
+            after = last_id
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+async def event_poll(request):
+    """
+    Long-poll fallback: waits up to ``?timeout=`` seconds for events after
+    ``?after=<last_id>``. Without ``after`` it returns the current
+    ``last_id`` straight away; ``reset`` means events were missed.
+    """
+    user_id = await _event_user_id(request)
+    if user_id is None:
+        return _error('Valid authentication credentials were not provided.', status=401)
+    broker = events.get_broker()
+    after = _event_id(request.GET.get('after'))
+    if after is None:
+        return JsonResponse({'events': [], 'last_id': broker.last_id, 'reset': False})
+    try:
+        timeout = float(request.GET.get('timeout', POLL_TIMEOUT))
+    except ValueError:
+        return _error('timeout must be a number of seconds.')
+    timeout = min(max(timeout, 0), MAX_POLL_TIMEOUT)
+    batch, complete, last_id = await broker.wait(user_id, after, timeout)
+    return JsonResponse({'events': batch, 'last_id': last_id, 'reset': not complete})
@@ -0,0 +1,90 @@
+"""
+JWT authentication that serves the user from a cache.
+
+simplejwt's ``JWTAuthentication`` loads the user on every request, and the
+permission classes then load ``shop_profile`` separately. Here the user is
+loaded once together with their shop profile and cached under their id for
+a short time, so an authenticated request reaches the view without a
+query. Signals drop the entry whenever the user or their shop profile
+changes; the timeout bounds how long a missed change can linger.
+
+Requests that may write (anything but GET, HEAD and OPTIONS) always load
+the user from the database, so a view saving ``request.user`` never writes
+an outdated row back. The cache is only used when its backend is shared by
+all workers; a per-process cache would miss other workers' invalidations.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import is_shared
+
+
+def _cache():
+    alias = getattr(settings, 'JOBS_AUTH_CACHE_ALIAS', 'default')
+    return caches[alias] if is_shared(alias) else None
+
+
+def _timeout():
+    return getattr(settings, 'JOBS_AUTH_CACHE_TIMEOUT', 60)
+
+
+def user_key(user_id):
+    return f'jobs:auth-user:{user_id}'
+
+
+def forget(*user_ids):
+    """Drop the cached users, now and again when the current transaction commits."""
+    cache = _cache()
+    if cache is None:
+        return
+    keys = [user_key(user_id) for user_id in user_ids]
+    # Until the commit other requests still read, and may cache, the old rows
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # DRF creates the authenticators per request
+    read_only = False
+
+    def authenticate(self, request):
+        self.read_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = _cache()
+        key = user_key(user_id)
+        user = cache.get(key) if cache is not None and self.read_only else None
+        if user is None:
+            # A missing shop profile is cached as well, so the permission
+            # classes' lookups never reach the database
+            user = (
+                self.user_model.objects.select_related('shop_profile')
+                .filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            )
+            if user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if cache is not None:
+                cache.set(key, user, _timeout())
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
@@ -0,0 +1,282 @@
+"""
+Latency, query count and response size of the API endpoints.
+
+``ENDPOINTS`` lists a request for each endpoint of the API router, filled in
+with ids from the dataset by ``targets``. ``measure`` sends each request
+through the full stack (JWT authentication included), and ``compare``
+checks a result set against a baseline saved from an earlier run. Writes
+run inside a transaction that is rolled back, so every repetition sees the
+same data.
+"""
+import math
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import synthetic, uploads
+from .counters import view_counter
+from .models import CVUpload, JobApplication, JobVacancy, User, VacancyComment
+from .tasks import staging_storage
+
+# A vacancy as a shop owner would post it
+JOB = {
+    'title': 'Weekend Barista', 'job_type': 'PART_TIME', 'description': 'Coffee, pastries and good company.',
+    'skills_required': 'Espresso, customer service', 'experience_required': 'Entry Level',
+    'education_required': 'None', 'salary_range': '$16 / hr',
+}
+# Content of the resumable uploads, sent in one chunk
+CV = b'%PDF-1.4\n' + b'0' * 4096
+
+# name: (method, path, user, body, query budget). Budgets hold at any
+# dataset size; a request that needs more queries has a per-row lookup.
+# Deleting a shop or job cascades to rows whose delete signals each run
+# queries, so those have no budget and are only compared to the baseline.
+# Writes include loading the user, which they never take from the cache.
+# Creating a shop is left out, as every synthetic owner already has one;
+# applications and comments are created through jobs-apply and jobs-comment.
+# The event stream never ends, so only its long-poll fallback is measured.
+# A bytes body is sent raw, as upload chunks are.
+ENDPOINTS = {
+    'users-list': ('get', '/api/users/', None, None, 1),
+    'users-detail': ('get', '/api/users/{seeker}/', None, None, 1),
+    'users-me': ('get', '/api/users/me/', 'seeker', None, 0),
+    'users-change-password': (
+        'post', '/api/users/change_password/', 'seeker',
+        {'current_password': synthetic.PASSWORD, 'new_password': 'Another-Pass-456', 'confirm_password': 'Another-Pass-456'}, 2,
+    ),
+    'users-update-profile': ('patch', '/api/users/update_profile/', 'seeker', {'mobile_number': '5550199'}, 2),
+    'shops-list': ('get', '/api/shops/', None, None, 1),
+    'shops-near': ('get', '/api/shops/?near={near}', None, None, 1),
+    'shops-detail': ('get', '/api/shops/{shop}/', None, None, 1),
+    'shops-my-shop': ('get', '/api/shops/my_shop/', 'owner', None, 0),
+    'shops-analytics': ('get', '/api/shops/analytics/', 'owner', None, 3),
+    'shops-export-applicants': ('get', '/api/shops/export_applicants/', 'owner', None, 1),
+    'shops-update': ('patch', '/api/shops/{shop}/', 'owner', {'description': 'Now open on Sundays.'}, 3),
+    'shops-delete': ('delete', '/api/shops/{shop}/', 'owner', None, None),
+    'jobs-list': ('get', '/api/jobs/', None, None, 1),
+    'jobs-list-full': ('get', '/api/jobs/?view=full', None, None, 2),
+    'jobs-search': ('get', '/api/jobs/?q=team', None, None, 2),
+    'jobs-near': ('get', '/api/jobs/?near={near}', None, None, 2),
+    'jobs-detail': ('get', '/api/jobs/{job}/', None, None, 2),
+    'jobs-create': ('post', '/api/jobs/', 'owner', JOB, 8),
+    'jobs-update': ('patch', '/api/jobs/{job}/', 'owner', {'salary_range': '$18 / hr'}, 4),
+    'jobs-delete': ('delete', '/api/jobs/{job}/', 'owner', None, None),
+    'jobs-apply': ('post', '/api/jobs/{open_job}/apply/', 'seeker', {'meets_requirements': True}, 9),
+    'jobs-comment': ('post', '/api/jobs/{job}/comment/', 'seeker', {'text': 'Is this still open?'}, 4),
+    'jobs-bulk-reject-pending': ('post', '/api/jobs/{job}/bulk_reject_pending/', 'owner', {}, 6),
+    'jobs-export-applicants-csv': ('get', '/api/jobs/{job}/export_applicants_csv/', 'owner', None, 2),
+    'applications-list': ('get', '/api/applications/', 'seeker', None, 1),
+    'applications-list-full': ('get', '/api/applications/?view=full', 'seeker', None, 2),
+    'applications-list-owner': ('get', '/api/applications/', 'owner', None, 1),
+    'applications-detail': ('get', '/api/applications/{application}/', 'seeker', None, 2),
+    'applications-update': ('patch', '/api/applications/{application}/', 'seeker', {'notes': 'Available from June.'}, 4),
+    'applications-delete': ('delete', '/api/applications/{application}/', 'seeker', None, 5),
+    'applications-summary': ('get', '/api/applications/summary/', 'seeker', None, 1),
+    'applications-my-cvs': ('get', '/api/applications/my_cvs/', 'seeker', None, 1),
+    'applications-bulk-update-status': (
+        'post', '/api/applications/bulk_update_status/', 'owner',
+        {'filter': {'job': '{job}', 'status': 'PENDING'}, 'status': 'SHORTLISTED'}, 5,
+    ),
+    'comments-list': ('get', '/api/comments/', 'seeker', None, 2),
+    'comments-update': ('patch', '/api/comments/{comment}/', 'commenter', {'text': 'Is there parking nearby?'}, 4),
+    'comments-delete': ('delete', '/api/comments/{comment}/', 'commenter', None, 5),
+    'cv-uploads-create': (
+        'post', '/api/cv_uploads/', 'seeker', {'filename': 'cv.pdf', 'content_type': 'application/pdf', 'size': len(CV)}, 2,
+    ),
+    'cv-uploads-detail': ('get', '/api/cv_uploads/{upload}/', 'seeker', None, 1),
+    'cv-uploads-chunk': ('put', '/api/cv_uploads/{new_upload}/chunk/?offset=0', 'seeker', CV, 3),
+    'cv-uploads-finalize': ('post', '/api/cv_uploads/{upload}/finalize/', 'seeker', None, 3),
+    'async-jobs-list': ('get', '/api/async/jobs/', None, None, 1),
+    'async-jobs-search': ('get', '/api/async/jobs/?q=team', None, None, 1),
+    'async-jobs-near': ('get', '/api/async/jobs/?near={near}', None, None, 1),
+    'async-jobs-detail': ('get', '/api/async/jobs/{job}/', None, None, 2),
+    'async-jobs-comments': ('get', '/api/async/jobs/{job}/comments/', None, None, 2),
+    'async-shops-list': ('get', '/api/async/shops/', None, None, 1),
+    'async-shops-near': ('get', '/api/async/shops/?near={near}', None, None, 1),
+    'async-shops-detail': ('get', '/api/async/shops/{shop}/', None, None, 1),
+    'events-ticket': ('post', '/api/events/ticket/', 'seeker', None, 1),
+    'events-poll': ('get', '/api/events/poll/?after=0&timeout=0', 'seeker', None, 1),
+}
+
+
+def targets():
+    """Pick the busiest owner, job and seeker, so the requests do real work."""
+    job = (
+        JobVacancy.objects.filter(shop__is_verified=True)
+        .annotate(n=Count('applications', filter=Q(applications__status='PENDING')))
+        .order_by('-n', 'id').select_related('shop').first()
+    )
+    seeker = (
+        User.objects.filter(role='JOB_SEEKER').annotate(n=Count('applications'))
+        .order_by('-n', 'id').first()
+    )
+    if job is None or seeker is None:
+        raise ValueError('The dataset needs a verified shop with a job and a job seeker.')
+    application = JobApplication.objects.filter(applicant=seeker).order_by('id').first()
+    # A reply nobody answered, so deleting it removes one row
+    comment = VacancyComment.objects.filter(user__role='JOB_SEEKER', replies__isnull=True).order_by('id').first()
+    open_job = JobVacancy.objects.filter(is_active=True).exclude(applications__applicant=seeker).order_by('id').first()
+    return {
+        'users': {'owner': job.shop.user_id, 'seeker': seeker.pk, 'commenter': comment.user_id if comment else seeker.pk},
+        'ids': {
+            'job': job.pk,
+            'shop': job.shop_id,
+            'near': f'{job.shop.latitude or synthetic.CENTER[0]},{job.shop.longitude or synthetic.CENTER[1]}',
+            'application': application.pk if application else 0,
+            'comment': comment.pk if comment else 0,
+            'seeker': seeker.pk,
+            'open_job': open_job.pk if open_job else job.pk,
+        },
+    }
+
+
+@contextmanager
+def upload_targets(seeker):
+    """
+    A fully received upload and an empty one of the seeker, removed again
+    afterwards with the staging files the requests left behind.
+    """
+    staging = staging_storage()
+    before = set(staging.listdir('uploads')[1]) if staging.exists('uploads') else set()
+    upload = CVUpload.objects.create(user=seeker, filename='cv.pdf', content_type='application/pdf', size=len(CV), received=len(CV))
+    new_upload = CVUpload.objects.create(user=seeker, filename='cv.pdf', content_type='application/pdf', size=len(CV))
+    uploads.create_staging_file(new_upload)
+    uploads.create_staging_file(upload)
+    with open(staging.path(upload.staged_name), 'wb') as staged:
+        staged.write(CV)
+    try:
+        yield {'upload': upload.pk, 'new_upload': new_upload.pk}
+    finally:
+        CVUpload.objects.filter(pk__in=[upload.pk, new_upload.pk]).delete()
+        for name in set(staging.listdir('uploads')[1]) - before:
+            staging.delete(f'uploads/{name}')
+
+
+def benchmark_settings(response_cache=False):
+    """
+    Settings for measuring in this single process, where a local cache is
+    as good as a shared one. The user cache is on; the anonymous response
+    cache only with ``response_cache``, otherwise reads do their full work.
+    """
+    auth_alias = getattr(settings, 'JOBS_AUTH_CACHE_ALIAS', 'default')
+    if response_cache:
+        return override_settings(JOBS_SHARED_CACHES=[auth_alias, getattr(settings, 'JOBS_RESPONSE_CACHE_ALIAS', 'default')])
+    return override_settings(
+        CACHES={**settings.CACHES, 'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        JOBS_RESPONSE_CACHE_ALIAS='benchmark',
+        JOBS_SHARED_CACHES=[auth_alias],
+    )
+
+
+def percentile(timings, fraction):
+    """Nearest-rank percentile of sorted ``timings``: the smallest value at least ``fraction`` of them do not exceed."""
+    return timings[max(math.ceil(len(timings) * fraction) - 1, 0)]
+
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        # A placeholder on its own stands for the integer id
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in ids:
+            return ids[value[1:-1]]
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def _send(client, method, path, body, token):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+    if method == 'get':
+        response = client.get(path, **headers)
+    elif isinstance(body, bytes):
+        response = getattr(client, method)(path, body, content_type='application/octet-stream', **headers)
+    else:
+        response = getattr(client, method)(path, body, format='json', **headers)
+    # Streamed bodies are produced while they are read
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return response.status_code, len(content)
+
+
+def _timed(client, method, path, body, token):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        status, size = _send(client, method, path, body, token)
+        elapsed = (time.perf_counter() - start) * 1000
+    return status, size, len(queries), elapsed
+
+
+def _run(client, method, path, body, token):
+    if method == 'get':
+        return _timed(client, method, path, body, token)
+    # Rolled back outside the measurement
+    with transaction.atomic():
+        result = _timed(client, method, path, body, token)
+        transaction.set_rollback(True)
+    return result
+
+
+def measure(names=None, repeat=10):
+    """
+    Request each endpoint once to warm up and then ``repeat`` times.
+    Returns ``{name: {...}}`` with the median and p95 time in ms, the
+    largest query count, the response size in bytes and the status.
+    """
+    found = targets()
+    users = User.objects.in_bulk(found['users'].values())
+    tokens = {role: str(AccessToken.for_user(users[pk])) for role, pk in found['users'].items()}
+    client = APIClient()
+    results = {}
+    with upload_targets(users[found['users']['seeker']]) as upload_ids:
+        ids = {**found['ids'], **upload_ids}
+        for name in names or ENDPOINTS:
+            method, path, user, body, budget = ENDPOINTS[name]
+            path, body = _fill(path, ids), _fill(body, ids)
+            token = tokens.get(user)
+            _run(client, method, path, body, token)
+            timings, query_counts = [], []
+            for _ in range(repeat):
+                status, size, queries, elapsed = _run(client, method, path, body, token)
+                timings.append(elapsed)
+                query_counts.append(queries)
+            timings.sort()
+            results[name] = {
+                'path': path,
+                'status': status,
+                'median_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'queries': max(query_counts),
+                'query_budget': budget,
+                'bytes': size,
+            }
+    view_counter.flush()
+    return results
+
+
+def compare(results, baseline, time_threshold=0.25, bytes_threshold=0.10, min_time_ms=1.0):
+    """
+    Return a message for every endpoint over its query budget and every
+    regression against ``baseline``: any extra query, a median time more than ``time_threshold`` (and ``min_time_ms``)
+    slower, or a response more than ``bytes_threshold`` larger.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result['query_budget'] is not None and result['queries'] > result['query_budget']:
+            regressions.append(f"{name}: {result['queries']} queries, budget is {result['query_budget']}")
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+        slower = result['median_ms'] - before['median_ms']
+        if slower > min_time_ms and result['median_ms'] > before['median_ms'] * (1 + time_threshold):
+            regressions.append(f"{name}: median {before['median_ms']:.2f} -> {result['median_ms']:.2f} ms")
+        if result['bytes'] > before['bytes'] * (1 + bytes_threshold):
+            regressions.append(f"{name}: {before['bytes']} -> {result['bytes']} bytes")
+    return regressions
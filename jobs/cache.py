@@ -0,0 +1,120 @@
+"""
+Versioned response cache for the public job and shop read endpoints.
+
+Every cached response depends on a few *version keys*: one per list
+(``jobs``, ``shops``, ``comments``) and one per object (``job:<pk>``,
+``shop:<pk>``). A version is the time it was last bumped, so it doubles as
+the Last-Modified date. Model signals bump the affected versions; stale
+entries are never read again because the versions are part of the response
+cache key, and simply expire.
+
+Versions are only meaningful if every worker sees the same ones. With a
+per-process cache (such as the default LocMemCache) a bump would never
+reach the other workers, whose ETags would stay the same while the data
+changed, so responses are neither cached nor given validators then.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+# Backends whose entries are only visible to the process that wrote them
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared(alias):
+    """
+    Whether every worker sees the same entries in cache ``alias``, judged by
+    its backend unless the ``JOBS_SHARED_CACHES`` setting lists the aliases.
+    """
+    declared = getattr(settings, 'JOBS_SHARED_CACHES', None)
+    if declared is not None:
+        return alias in declared
+    return settings.CACHES[alias]['BACKEND'] not in LOCAL_BACKENDS
+
+
+def _alias():
+    return getattr(settings, 'JOBS_RESPONSE_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def _timeout():
+    return getattr(settings, 'JOBS_RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def version_key(*parts):
+    return 'jobs:version:' + ':'.join(str(part) for part in parts)
+
+
+def get_versions(keys):
+    cache = _cache()
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time()
+        for key in missing:
+            # add() keeps a version another process set in the meantime
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump(*keys):
+    """Move the versions on, now and again when the current transaction commits."""
+    if not is_shared(_alias()):
+        return
+    cache = _cache()
+    cache.set_many({key: time.time() for key in keys}, timeout=None)
+    # Until the commit other requests still read, and may cache, the old
+    # rows under the new version
+    transaction.on_commit(lambda: cache.set_many({key: time.time() for key in keys}, timeout=None))
+
+
+class CachedReadMixin:
+    """
+    Viewset mixin serving anonymous GETs from the response cache and
+    answering conditional requests with 304 before any serializer runs.
+    """
+
+    def cached_read(self, request, dependencies, render):
+        if request.method != 'GET' or request.user.is_authenticated or not is_shared(_alias()):
+            return render()
+
+        keys = [version_key(*dependency) for dependency in dependencies]
+        versions = get_versions(keys)
+        fingerprint = repr((request.get_full_path(), keys, versions)).encode()
+        digest = hashlib.md5(fingerprint, usedforsecurity=False).hexdigest()
+        etag = quote_etag(digest)
+        last_modified = int(max(versions))
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            not_modified['Cache-Control'] = 'no-cache'
+            return not_modified
+
+        cache_key = f'jobs:response:{digest}'
+        data = _cache().get(cache_key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = render()
+            if response.status_code != 200:
+                return response
+            _cache().set(cache_key, response.data, _timeout())
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -0,0 +1,107 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Buffers vacancy view increments in process memory and writes them back
+    in batches, one ``views = views + n`` update per job.
+
+    Every worker process keeps its own buffer. Because the writes are
+    relative increments, buffers from several processes can be flushed in
+    any order without losing views.
+
+    A view arriving after the flush interval flushes the buffer. A timer
+    started with the first buffered view flushes it as well, so views are
+    written within the interval even when no more arrive.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30)
+
+    def _record(self, job_id, count):
+        """Buffer an increment and report whether a flush is due."""
+        with self._lock:
+            self._pending[job_id] += count
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Failed to flush buffered job views')
+        finally:
+            # No request cycle closes this thread's connection
+            connection.close()
+
+    def increment(self, job_id, count=1):
+        if self._record(job_id, count):
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Failed to flush buffered job views')
+
+    async def aincrement(self, job_id, count=1):
+        # Only hop to a thread for the occasional flush, not every increment
+        if self._record(job_id, count):
+            try:
+                await sync_to_async(self.flush)()
+            except DatabaseError:
+                logger.exception('Failed to flush buffered job views')
+
+    def flush(self):
+        """Write all buffered increments and return them as ``{job_id: n}``."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return {}
+
+        from . import stats
+        from .models import JobVacancy
+
+        try:
+            with transaction.atomic():
+                for job_id, count in pending.items():
+                    JobVacancy.objects.filter(pk=job_id).update(views=F('views') + count)
+                stats.views_recorded(pending)
+        except DatabaseError:
+            # Put the increments back so the next flush retries them
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        return dict(pending)
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception('Failed to flush buffered job views on exit')
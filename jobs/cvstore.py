@@ -0,0 +1,72 @@
+"""
+Content-addressed CV storage.
+
+Each distinct CV is stored once, as a ``StoredCV`` keyed by the SHA-256 of
+its content; applications reference it and keep ``ref_count`` up to date.
+Every application keeps the name its applicant gave the file, so one
+seeker's filename is never shown to another.
+A CV that was stored before is linked straight away, without writing to
+the storage backend. Files nobody references any more are removed by
+``purge_cv_uploads`` after a grace period.
+"""
+import hashlib
+import os
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+
+from .models import JobApplication, StoredCV
+
+
+def sha256_of(chunks):
+    hasher = hashlib.sha256()
+    for chunk in chunks:
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def find(digest):
+    return StoredCV.objects.filter(digest=digest).first()
+
+
+def owned_by(user):
+    """The CVs ``user`` applied with, each annotated with ``own_filename``, the name they last used for it."""
+    names = (
+        JobApplication.objects.filter(stored_cv=OuterRef('pk'), applicant=user)
+        .order_by('-applied_at', '-pk').values('cv_filename')[:1]
+    )
+    return StoredCV.objects.filter(applications__applicant=user).distinct().annotate(own_filename=Subquery(names))
+
+
+def attach(application, stored, filename):
+    """Point ``application`` at ``stored``, uploaded as ``filename``. Safe to repeat."""
+    with transaction.atomic():
+        linked = JobApplication.objects.filter(pk=application.pk, stored_cv__isnull=True).update(
+            stored_cv=stored, cv=stored.file.name, cv_filename=filename
+        )
+        if linked:
+            StoredCV.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') + 1)
+    application.stored_cv = stored
+    application.cv = stored.file.name
+    application.cv_filename = filename
+
+
+def release(stored_cv_id):
+    StoredCV.objects.filter(pk=stored_cv_id).update(ref_count=F('ref_count') - 1)
+
+
+def store(content, filename, digest, size):
+    """Return the ``StoredCV`` for ``digest``, writing ``content`` to storage if it is new."""
+    existing = find(digest)
+    if existing is not None:
+        return existing
+    field = StoredCV._meta.get_field('file')
+    extension = os.path.splitext(filename)[1].lower()
+    name = field.storage.save(field.generate_filename(None, f'{digest}{extension}'), content)
+    try:
+        with transaction.atomic():
+            return StoredCV.objects.create(digest=digest, file=name, filename=filename, size=size)
+    except IntegrityError:
+        # Stored concurrently by another worker
+        field.storage.delete(name)
+        return StoredCV.objects.get(digest=digest)
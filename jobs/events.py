@@ -0,0 +1,155 @@
+"""
+Application and comment events for the streaming endpoints.
+
+Changes are published to a broker, which keeps the most recent events in a
+ring buffer and wakes the clients waiting on the SSE and long-poll
+endpoints. Every event carries an increasing id, so a reconnecting client
+resumes from the last id it saw. Each event is addressed to the users
+allowed to see it.
+
+``InProcessBroker`` only reaches clients connected to the same process.
+Deployments running several workers should point ``JOBS_EVENT_BROKER`` at
+a class with the same interface backed by an external broker.
+
+``EventSource`` cannot send an Authorization header, and a token in the
+URL ends up in access logs, so the stream is opened with a ticket instead:
+a random string issued to an authenticated user that expires after
+``TICKET_TIMEOUT`` seconds and can only be redeemed once.
+"""
+import asyncio
+import secrets
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    def __init__(self, buffer_size=1000):
+        self._events = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, users, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            self._events.append((self._last_id, frozenset(users), {'id': self._last_id, 'type': event_type, 'data': data}))
+            waiters = list(self._waiters)
+        # Publishers run in request threads; wake waiters on their own loops
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def events_after(self, user_id, after):
+        """
+        Return ``(events, complete, last_id)``: the events for ``user_id``
+        newer than ``after``, whether none were dropped from the buffer in
+        the meantime, and the id to resume from next time.
+        """
+        with self._lock:
+            # An id from the future means the buffer restarted with the process
+            complete = after <= self._last_id and (not self._events or self._events[0][0] <= after + 1)
+            events = [event for event_id, users, event in self._events if event_id > after and user_id in users]
+            return events, complete, self._last_id
+
+    async def wait(self, user_id, after, timeout):
+        """Wait up to ``timeout`` seconds for events newer than ``after``."""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        # Register before checking, so nothing published in between is missed
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            deadline = loop.time() + timeout
+            while True:
+                waiter[1].clear()
+                events, complete, last_id = self.events_after(user_id, after)
+                remaining = deadline - loop.time()
+                if events or not complete or remaining <= 0:
+                    return events, complete, last_id
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = import_string(getattr(settings, 'JOBS_EVENT_BROKER', 'jobs.events.InProcessBroker'))
+                _broker = broker_class(getattr(settings, 'JOBS_EVENT_BUFFER_SIZE', 1000))
+    return _broker
+
+
+TICKET_TIMEOUT = 30
+
+
+def _ticket_cache():
+    return caches[getattr(settings, 'JOBS_EVENT_TICKET_CACHE_ALIAS', 'default')]
+
+
+def _ticket_key(ticket):
+    return f'jobs:event-ticket:{ticket}'
+
+
+async def issue_ticket(user_id):
+    ticket = secrets.token_urlsafe(32)
+    await _ticket_cache().aset(_ticket_key(ticket), user_id, TICKET_TIMEOUT)
+    return ticket
+
+
+async def redeem_ticket(ticket):
+    """Return the id of the user the ticket was issued to, or None if it is unknown, expired or used."""
+    cache = _ticket_cache()
+    key = _ticket_key(ticket)
+    user_id = await cache.aget(key)
+    # Only the request whose delete removes the key may use it
+    if user_id is None or not await cache.adelete(key):
+        return None
+    return user_id
+
+
+def publish(users, event_type, data):
+    """Publish once the current transaction commits, so rolled back changes are never announced."""
+    users = {user for user in users if user is not None}
+    if users:
+        transaction.on_commit(lambda: get_broker().publish(users, event_type, data))
+
+
+def application_changed(application_id, job_id, status, previous_status, applicant_id, owner_id):
+    event_type = 'application.created' if previous_status is None else 'application.status_changed'
+    publish({applicant_id, owner_id}, event_type, {
+        'id': application_id,
+        'job_id': job_id,
+        'status': status,
+        'previous_status': previous_status,
+    })
+
+
+def comment_created(comment, owner_id):
+    # The author already knows about their own comment
+    if owner_id == comment.user_id:
+        return
+    publish({owner_id}, 'comment.created', {
+        'id': comment.pk,
+        'job_id': comment.job_id,
+        'parent_id': comment.parent_id,
+        'user': str(comment.user),
+        'text': comment.text,
+    })
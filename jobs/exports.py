@@ -0,0 +1,138 @@
+"""
+Exports of applicant data.
+
+Rows are read with ``values_list(...).iterator()``. CSV and NDJSON are
+streamed as they are produced, so memory use stays flat however many
+applications a job has and the client starts receiving data straight away.
+An XLSX file is a zip archive that can only be written once every row is
+known, so it is built in temporary files first and sent when complete.
+"""
+import csv
+import tempfile
+import zlib
+from datetime import timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, StreamingHttpResponse
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+# Approximate size of each chunk handed to the server
+STREAM_BUFFER_SIZE = 64 * 1024
+
+APPLICANT_COLUMNS = (
+    ('Name', 'applicant__username'),
+    ('Email', 'applicant__email'),
+    ('Mobile Number', 'applicant__mobile_number'),
+    ('Status', 'status'),
+    ('Applied Date', 'applied_at'),
+    ('Meets Requirements', 'meets_requirements'),
+    ('Applicant Notes', 'notes'),
+)
+
+SHOP_APPLICANT_COLUMNS = (
+    ('Job ID', 'job_id'),
+    ('Job Title', 'job__title'),
+) + APPLICANT_COLUMNS
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back what ``csv.writer`` wrote."""
+
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def _json_key(header):
+    return header.lower().replace(' ', '_')
+
+
+def iter_rows(queryset, columns):
+    fields = [field for _, field in columns]
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow([header for header, _ in columns])
+        for row in rows:
+            yield writer.writerow([_format_value(value) for value in row])
+
+    return _buffered(lines())
+
+
+def iter_ndjson(columns, rows):
+    keys = [_json_key(header) for header, _ in columns]
+    encoder = DjangoJSONEncoder()
+    return _buffered(encoder.encode(dict(zip(keys, row))) + '\n' for row in rows)
+
+
+def iter_gzip(chunks, encoding='utf-8'):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_download(chunks, filename, content_type, compress=False):
+    if compress:
+        chunks = iter_gzip(chunks)
+        content_type = 'application/gzip'
+        filename = f'{filename}.gz'
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_download(columns, rows, filename):
+    """
+    Build the workbook on disk and send it once it is finished. This is not
+    streamed: nothing reaches the client until every row is written. The
+    write-only workbook spools rows to a temporary file, and the saved
+    archive goes to another, so memory use still stays flat.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Applicants')
+    sheet.append([header for header, _ in columns])
+    for row in rows:
+        # Excel has no notion of time zones; export UTC wall-clock times
+        sheet.append([
+            value.astimezone(dt_timezone.utc).replace(tzinfo=None) if getattr(value, 'tzinfo', None) else value
+            for value in row
+        ])
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=CONTENT_TYPES['xlsx'])
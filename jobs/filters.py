@@ -0,0 +1,93 @@
+"""
+Server-side filtering and ordering for the vacancy listing.
+
+Kept free of request objects so the same filters serve the DRF viewset and
+the async read endpoints.
+"""
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ParseError
+
+from .models import JobVacancy
+
+# Allowed ?ordering= values; id breaks ties so keyset pagination is stable
+VACANCY_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+}
+DEFAULT_VACANCY_ORDERING = VACANCY_ORDERINGS['-created_at']
+
+
+def parse_moment(value):
+    """Parse an ISO date or datetime query parameter into an aware datetime."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_bool(value, name):
+    lowered = value.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ParseError(f'{name} must be true or false.')
+
+
+def vacancy_ordering(params):
+    value = params.get('ordering')
+    if not value:
+        return DEFAULT_VACANCY_ORDERING
+    if value not in VACANCY_ORDERINGS:
+        raise ParseError(f'ordering must be one of: {", ".join(VACANCY_ORDERINGS)}.')
+    return VACANCY_ORDERINGS[value]
+
+
+def filter_vacancies(queryset, params):
+    """
+    Apply the listing filters:
+
+    ?job_type=FULL_TIME,PART_TIME  ?is_active=true|false|all (default true)
+    ?shop=<id>  ?has_salary=true|false  ?created_after=<ISO date or datetime>
+    """
+    is_active = params.get('is_active', 'true')
+    if is_active != 'all':
+        queryset = queryset.filter(is_active=parse_bool(is_active, 'is_active'))
+
+    job_types = [value for value in params.get('job_type', '').split(',') if value]
+    if job_types:
+        valid = {code for code, _ in JobVacancy.JOB_TYPE_CHOICES}
+        if not set(job_types) <= valid:
+            raise ParseError(f'job_type must be one of: {", ".join(sorted(valid))}.')
+        queryset = queryset.filter(job_type__in=job_types)
+
+    shop = params.get('shop')
+    if shop:
+        if not shop.isdigit():
+            raise ParseError('shop must be a shop id.')
+        queryset = queryset.filter(shop_id=int(shop))
+
+    has_salary = params.get('has_salary')
+    if has_salary:
+        if parse_bool(has_salary, 'has_salary'):
+            queryset = queryset.exclude(salary_range__isnull=True).exclude(salary_range='')
+        else:
+            queryset = queryset.filter(Q(salary_range__isnull=True) | Q(salary_range=''))
+
+    created_after = params.get('created_after')
+    if created_after:
+        moment = parse_moment(created_after)
+        if moment is None:
+            raise ParseError('created_after must be an ISO date or datetime.')
+        queryset = queryset.filter(created_at__gte=moment)
+
+    return queryset
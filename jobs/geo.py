@@ -0,0 +1,70 @@
+"""
+Distance queries over ``ShopProfile.latitude`` / ``longitude``.
+
+A bounding box on the indexed coordinate columns narrows the candidates
+first, then the exact great-circle (haversine) distance is computed in the
+database for the remaining rows only.
+"""
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 500.0
+
+
+def parse_point(value):
+    """Parse ``"lat,lng"`` into a pair of floats, raising ``ValueError``."""
+    lat, lng = (float(part) for part in value.split(','))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Coordinates out of range.')
+    return lat, lng
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Return ``(min_lat, max_lat, min_lng, max_lng)`` enclosing the circle.
+    The longitude bounds are ``None`` when the box reaches a pole or crosses
+    the antimeridian, in which case only latitude can be used to prefilter.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+    delta_lng = math.degrees(radius_km / EARTH_RADIUS_KM / math.cos(math.radians(lat)))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def haversine_km(lat, lng, prefix=''):
+    """Database expression for the distance in km from ``(lat, lng)`` to each row."""
+    row_lat = Radians(F(f'{prefix}latitude'))
+    row_lng = Radians(F(f'{prefix}longitude'))
+    half_dlat = (row_lat - Value(math.radians(lat))) / 2
+    half_dlng = (row_lng - Value(math.radians(lng))) / 2
+    a = Power(Sin(half_dlat), 2) + Value(math.cos(math.radians(lat))) * Cos(row_lat) * Power(Sin(half_dlng), 2)
+    # Clamp rounding error so asin() never sees a value above 1
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
+
+
+def within_radius(queryset, lat, lng, radius_km, prefix=''):
+    """
+    Filter ``queryset`` to rows within ``radius_km`` of ``(lat, lng)``,
+    annotated with ``distance_km`` and ordered nearest first. ``prefix``
+    is the lookup path to the shop, e.g. ``'shop__'`` for vacancies.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    queryset = queryset.filter(**{f'{prefix}latitude__range': (min_lat, max_lat)})
+    if min_lng is not None:
+        queryset = queryset.filter(**{f'{prefix}longitude__range': (min_lng, max_lng)})
+    else:
+        queryset = queryset.filter(**{f'{prefix}longitude__isnull': False})
+    return (
+        queryset.annotate(distance_km=haversine_km(lat, lng, prefix))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', '-id')
+    )
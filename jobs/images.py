@@ -0,0 +1,130 @@
+"""
+Derivatives of uploaded images: shop logos, profile photos and job images.
+
+After an upload is committed, a background task re-encodes the original
+without EXIF metadata (and scaled down if it is larger than
+``MAX_DIMENSION``) and writes a small WebP thumbnail to the matching
+``*_thumb`` field. Listing pages link the thumbnails instead of the
+originals.
+"""
+import io
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models import Q
+
+# (model label, source field): (thumbnail field, bounding box in pixels)
+IMAGE_FIELDS = {
+    ('jobs.user', 'profile_photo'): ('profile_photo_thumb', (160, 160)),
+    ('jobs.shopprofile', 'logo'): ('logo_thumb', (160, 160)),
+    ('jobs.jobvacancy', 'image'): ('image_thumb', (480, 320)),
+}
+# Longest side kept for originals
+MAX_DIMENSION = 2048
+THUMB_QUALITY = 80
+ORIGINAL_QUALITY = 85
+# Formats an original is re-encoded in; anything else becomes PNG
+ORIGINAL_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+def source_fields(model):
+    label = model._meta.label_lower
+    return [field for model_label, field in IMAGE_FIELDS if model_label == label]
+
+
+def schedule(instance, field_name):
+    """Queue processing of ``instance.<field_name>`` on the task queue."""
+    from .queue import enqueue
+
+    enqueue('process_image', {'label': instance._meta.label_lower, 'pk': instance.pk, 'field_name': field_name})
+
+
+def _encode(image, image_format, **options):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    output = io.BytesIO()
+    # Saving without exif= drops the metadata
+    image.save(output, image_format, **options)
+    return ContentFile(output.getvalue())
+
+
+def _needs_reencoding(image):
+    return (
+        max(image.size) > MAX_DIMENSION
+        or image.format not in ORIGINAL_FORMATS
+        or bool(image.getexif())
+        or any(key in image.info for key in ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment'))
+    )
+
+
+def _invalidate(instance):
+    from . import signals
+
+    handlers = {
+        'jobs.user': signals.invalidate_shop_owner,
+        'jobs.shopprofile': signals.invalidate_shop,
+        'jobs.jobvacancy': signals.invalidate_vacancy,
+    }
+    handlers[instance._meta.label_lower](sender=type(instance), instance=instance)
+    if instance._meta.label_lower != 'jobs.jobvacancy':
+        signals.forget_authenticated_user(sender=type(instance), instance=instance)
+
+
+def process_image(label, pk, field_name):
+    """Sanitize the original image and (re)build its thumbnail."""
+    from PIL import Image, ImageOps
+
+    model = apps.get_model(label)
+    thumb_field, box = IMAGE_FIELDS[(label, field_name)]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    source = getattr(instance, field_name)
+    thumb = getattr(instance, thumb_field)
+
+    if not source:
+        if thumb:
+            cleared = Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})
+            model.objects.filter(cleared, pk=pk).update(**{thumb_field: None})
+            thumb.storage.delete(thumb.name)
+            _invalidate(instance)
+        return
+
+    with source.open('rb') as handle:
+        image = Image.open(handle)
+        image.load()
+    reencode = _needs_reencoding(image)
+    image_format = image.format if image.format in ORIGINAL_FORMATS else 'PNG'
+    image = ImageOps.exif_transpose(image)
+    stem = os.path.splitext(os.path.basename(source.name))[0]
+
+    original_name = source.name
+    created = []
+    if reencode:
+        capped = image.copy()
+        capped.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.Resampling.LANCZOS)
+        filename = source.field.generate_filename(instance, stem + ORIGINAL_FORMATS[image_format])
+        original_name = source.storage.save(filename, _encode(capped, image_format, quality=ORIGINAL_QUALITY))
+        created.append((source.storage, original_name))
+
+    small = image.copy()
+    small.thumbnail(box, Image.Resampling.LANCZOS)
+    filename = thumb.field.generate_filename(instance, f'{stem}.webp')
+    thumb_name = thumb.storage.save(filename, _encode(small, 'WEBP', quality=THUMB_QUALITY, method=4))
+    created.append((thumb.storage, thumb_name))
+
+    # Only write back if the image was not replaced while we worked
+    updated = model.objects.filter(pk=pk, **{field_name: source.name}).update(
+        **{field_name: original_name, thumb_field: thumb_name}
+    )
+    if not updated:
+        for storage, name in created:
+            storage.delete(name)
+        return
+    if original_name != source.name:
+        source.storage.delete(source.name)
+    if thumb:
+        thumb.storage.delete(thumb.name)
+    _invalidate(instance)
@@ -0,0 +1,59 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import cvstore
+from jobs.models import JobApplication, StoredCV
+
+
+class Command(BaseCommand):
+    help = (
+        'Move CVs of applications made before CVs were stored by digest into StoredCV, '
+        'deleting files whose content is already stored.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be done.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        linked = removed = missing = freed = 0
+        seen = set()
+        legacy = JobApplication.objects.filter(stored_cv__isnull=True).exclude(cv='').exclude(cv__isnull=True)
+        for application in legacy.order_by('pk').iterator():
+            name = application.cv.name
+            storage = application.cv.storage
+            if not storage.exists(name):
+                missing += 1
+                continue
+            with storage.open(name, 'rb') as handle:
+                digest = cvstore.sha256_of(handle.chunks())
+            size = storage.size(name)
+            stored = cvstore.find(digest)
+            linked += 1
+            if dry_run:
+                if stored is not None or digest in seen:
+                    freed += size
+                seen.add(digest)
+                continue
+            with transaction.atomic():
+                if stored is None:
+                    # The first copy of a CV becomes the stored one, where it is
+                    stored = StoredCV.objects.create(
+                        digest=digest, file=name, filename=os.path.basename(name), size=size
+                    )
+                cvstore.attach(application, stored, os.path.basename(name))
+            # Applications may share a file name; keep it while any still uses it
+            if stored.file.name != name and not JobApplication.objects.filter(cv=name).exists():
+                storage.delete(name)
+                removed += 1
+                freed += size
+
+        if dry_run:
+            summary = f'Would link {linked} CVs and free {freed} bytes.'
+        else:
+            summary = f'Linked {linked} CVs and deleted {removed} duplicate files ({freed} bytes).'
+        if missing:
+            summary += f' {missing} CV files were missing.'
+        self.stdout.write(self.style.SUCCESS(summary))
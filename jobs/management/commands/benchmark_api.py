@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from jobs import benchmarks, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database with synthetic data and measure the time, query count '
+        'and response size of every API endpoint, optionally against a saved baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shops', type=int, default=20)
+        parser.add_argument('--jobs-per-shop', type=int, default=10)
+        parser.add_argument('--seekers', type=int, default=200)
+        parser.add_argument('--applications-per-seeker', type=int, default=5)
+        parser.add_argument('--comment-trees', type=int, default=3, help='Comment threads per vacancy.')
+        parser.add_argument('--comment-depth', type=int, default=3, help='Comments per thread.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20, help='Measured requests per endpoint.')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', choices=sorted(benchmarks.ENDPOINTS), help='Only this endpoint (repeatable).')
+        parser.add_argument('--response-cache', action='store_true', help='Keep the anonymous response cache on.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against.')
+        parser.add_argument('--time-threshold', type=float, default=0.25, help='Allowed median slowdown, as a fraction.')
+        parser.add_argument('--bytes-threshold', type=float, default=0.10, help='Allowed response growth, as a fraction.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)
+
+        dataset = {
+            'shops': options['shops'],
+            'jobs_per_shop': options['jobs_per_shop'],
+            'seekers': options['seekers'],
+            'applications_per_seeker': options['applications_per_seeker'],
+            'comment_trees': options['comment_trees'],
+            'comment_depth': options['comment_depth'],
+            'seed': options['seed'],
+        }
+        if baseline and baseline['dataset'] != dataset:
+            self.stderr.write(self.style.WARNING('The baseline was measured on a different dataset.'))
+
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            created = synthetic.generate(**dataset)
+            self.stdout.write(', '.join(f'{count} {kind}' for kind, count in created.items()))
+            with benchmarks.benchmark_settings(options['response_cache']):
+                results = benchmarks.measure(options['endpoints'], options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>34}: {result['status']}  median {result['median_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  {result['queries']:3d} queries  {result['bytes']:8d} bytes"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({'dataset': dataset, 'repeat': options['repeat'], 'endpoints': results}, handle, indent=2)
+
+        regressions = benchmarks.compare(
+            results, baseline['endpoints'] if baseline else {}, options['time_threshold'], options['bytes_threshold']
+        )
+        if regressions:
+            raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -0,0 +1,77 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from jobs.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-request database connection overhead of the configured '
+        'connection handling against opening a fresh connection for every request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode.')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark.')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        configured = copy.deepcopy(connections[alias].settings_dict)
+        if connections[alias].vendor != 'postgresql':
+            self.stderr.write(self.style.WARNING(
+                'Connection setup is nearly free on this backend; run against PostgreSQL for meaningful numbers.'
+            ))
+
+        # The behaviour this project had before: CONN_MAX_AGE = 0 and no pool
+        baseline = copy.deepcopy(configured)
+        baseline['CONN_MAX_AGE'] = 0
+        baseline['OPTIONS'] = {key: value for key, value in baseline.get('OPTIONS', {}).items() if key != 'pool'}
+
+        results = {
+            'new connection per request': self.measure(baseline, f'{alias}_bench_baseline', options['requests']),
+            'configured': self.measure(configured, f'{alias}_bench_configured', options['requests']),
+        }
+
+        pool = configured.get('OPTIONS', {}).get('pool')
+        self.stdout.write(
+            f"Configured: CONN_MAX_AGE={configured.get('CONN_MAX_AGE')}, "
+            f"CONN_HEALTH_CHECKS={configured.get('CONN_HEALTH_CHECKS')}, pool={'on' if pool else 'off'}"
+        )
+        for name, timings in results.items():
+            timings.sort()
+            self.stdout.write(
+                f'{name:>28}: mean {statistics.mean(timings):7.2f} ms  '
+                f'median {statistics.median(timings):7.2f} ms  '
+                f'p95 {percentile(timings, 0.95):7.2f} ms'
+            )
+        saved = statistics.mean(results['new connection per request']) - statistics.mean(results['configured'])
+        self.stdout.write(self.style.SUCCESS(f'Overhead saved per request: {saved:.2f} ms'))
+
+    def measure(self, settings_dict, alias, requests):
+        """
+        Time ``requests`` request cycles on a private connection: the same
+        close_if_unusable_or_obsolete() calls Django makes on request_started
+        and request_finished, around a trivial query.
+        """
+        backend = load_backend(settings_dict['ENGINE'])
+        connection = backend.DatabaseWrapper(settings_dict, alias)
+        timings = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+        return timings
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from jobs import images
+
+
+class Command(BaseCommand):
+    help = 'Build thumbnails and sanitize originals for uploaded images that have not been processed yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reprocess images that already have a thumbnail.')
+
+    def handle(self, *args, **options):
+        processed = 0
+        for (label, field), (thumb_field, _) in images.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            queryset = model.objects.exclude(Q(**{field: ''}) | Q(**{f'{field}__isnull': True}))
+            if not options['all']:
+                queryset = queryset.filter(Q(**{thumb_field: ''}) | Q(**{f'{thumb_field}__isnull': True}))
+            for pk in queryset.values_list('pk', flat=True).iterator():
+                try:
+                    images.process_image(label, pk, field)
+                except Exception as exc:
+                    self.stderr.write(f'{label} {pk} {field}: {exc}')
+                    continue
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} images.'))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import uploads
+from jobs.models import CVUpload, StoredCV
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete resumable CV uploads (and their staged files) that were abandoned or already used, '
+        'and stored CVs no application references any more.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Only purge uploads older than this.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = CVUpload.objects.filter(created_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            # Used uploads' staged files are removed by the store_cv task
+            if upload.status != 'USED':
+                uploads.discard(upload)
+            count += 1
+        stale.delete()
+
+        # The grace period keeps a CV that is about to be reused by digest
+        unreferenced = 0
+        for stored in StoredCV.objects.filter(ref_count__lte=0, created_at__lt=cutoff).iterator():
+            deleted, _ = StoredCV.objects.filter(pk=stored.pk, ref_count__lte=0, applications__isnull=True).delete()
+            if deleted:
+                stored.file.storage.delete(stored.file.name)
+                unreferenced += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {count} CV uploads and {unreferenced} stored CVs.'))
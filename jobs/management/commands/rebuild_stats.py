@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ShopStats / JobStats analytics rollups from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, action='append', dest='shops', help='Only rebuild this shop id (repeatable).')
+
+    def handle(self, *args, **options):
+        count = stats.rebuild(options['shops'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt analytics for {count} shops.'))
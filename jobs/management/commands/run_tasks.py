@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import queue
+
+
+def _run(task):
+    # Each worker thread has its own connection; drop it if it went stale
+    close_old_connections()
+    try:
+        return queue.run_task(task)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (CV storage, image processing, rollup updates).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks run at the same time.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no tasks are due instead of polling.')
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        totals = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tasks') as pool:
+            try:
+                while True:
+                    tasks = queue.claim(concurrency)
+                    if not tasks:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    for task, outcome in zip(tasks, pool.map(_run, tasks)):
+                        totals[outcome] = totals.get(outcome, 0) + 1
+                        if options['verbosity'] > 1:
+                            self.stdout.write(f'{task.name} #{task.pk}: {outcome}')
+            except KeyboardInterrupt:
+                # Claimed tasks still running are retried once their lease expires
+                pass
+        summary = ', '.join(f'{count} {outcome.lower()}' for outcome, count in sorted(totals.items())) or 'nothing'
+        self.stdout.write(self.style.SUCCESS(f'Ran tasks: {summary}.'))
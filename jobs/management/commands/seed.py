@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import geo, synthetic
+from jobs.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic shops, vacancies, job seekers, applications and comment '
+        f'threads. Every user has the password "{synthetic.PASSWORD}".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shops', type=int, default=10)
+        parser.add_argument('--jobs-per-shop', type=int, default=5)
+        parser.add_argument('--seekers', type=int, default=50)
+        parser.add_argument('--applications-per-seeker', type=int, default=3)
+        parser.add_argument('--comment-trees', type=int, default=2, help='Comment threads per vacancy.')
+        parser.add_argument('--comment-depth', type=int, default=3, help='Comments per thread, each replying to the last.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; it is also part of every username.')
+        parser.add_argument('--center', default=','.join(str(part) for part in synthetic.CENTER), help='"lat,lng" the shops are spread around.')
+        parser.add_argument('--radius-km', type=float, default=25.0)
+        parser.add_argument('--batch-size', type=int, default=synthetic.BATCH_SIZE, help='Rows per insert and per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            center = geo.parse_point(options['center'])
+        except ValueError:
+            raise CommandError('--center must be "lat,lng".')
+        for name in ('shops', 'jobs_per_shop', 'seekers', 'applications_per_seeker', 'comment_trees', 'comment_depth'):
+            if options[name] < 0:
+                raise CommandError(f'--{name.replace("_", "-")} must not be negative.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        seed = options['seed']
+        if User.objects.filter(username__in=[f'owner_{seed}_0', f'seeker_{seed}_0']).exists():
+            raise CommandError(f'The database already holds data for seed {seed}; pass another --seed.')
+
+        start = time.monotonic()
+        created = synthetic.generate(
+            shops=options['shops'],
+            jobs_per_shop=options['jobs_per_shop'],
+            seekers=options['seekers'],
+            applications_per_seeker=options['applications_per_seeker'],
+            comment_trees=options['comment_trees'],
+            comment_depth=options['comment_depth'],
+            seed=seed,
+            center=center,
+            radius_km=options['radius_km'],
+            batch_size=options['batch_size'],
+            progress=lambda message: self.stdout.write(f'{message} ({time.monotonic() - start:.1f}s)'),
+        )
+        summary = ', '.join(f'{count} {kind}' for kind, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} in {time.monotonic() - start:.1f}s.'))
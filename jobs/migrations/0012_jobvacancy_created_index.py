@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_alter_jobapplication_cv'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['-created_at', '-id'], name='jobs_vacancy_created_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_jobvacancy_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopStats',
+            fields=[
+                ('shop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='jobs.shopprofile')),
+                ('jobs', models.IntegerField(default=0)),
+                ('views', models.IntegerField(default=0)),
+                ('applications', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobStats',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='jobs.jobvacancy')),
+                ('views', models.IntegerField(default=0)),
+                ('applications', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_stats', to='jobs.shopprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import migrations
+
+# The DDL is written out here rather than taken from jobs.search, so this
+# migration keeps creating the index it always did as that module changes.
+SQLITE_INSTALL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_jobvacancy_fts USING fts5("
+    "title, description, skills_required, content='jobs_jobvacancy', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_jobvacancy_fts_ai AFTER INSERT ON jobs_jobvacancy BEGIN
+        INSERT INTO jobs_jobvacancy_fts(rowid, title, description, skills_required)
+        VALUES (new.id, new.title, new.description, new.skills_required);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_jobvacancy_fts_ad AFTER DELETE ON jobs_jobvacancy BEGIN
+        INSERT INTO jobs_jobvacancy_fts(jobs_jobvacancy_fts, rowid, title, description, skills_required)
+        VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_jobvacancy_fts_au
+    AFTER UPDATE OF title, description, skills_required ON jobs_jobvacancy BEGIN
+        INSERT INTO jobs_jobvacancy_fts(jobs_jobvacancy_fts, rowid, title, description, skills_required)
+        VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+        INSERT INTO jobs_jobvacancy_fts(rowid, title, description, skills_required)
+        VALUES (new.id, new.title, new.description, new.skills_required);
+    END
+    """,
+    "INSERT INTO jobs_jobvacancy_fts(jobs_jobvacancy_fts) VALUES ('rebuild')",
+)
+SQLITE_UNINSTALL = (
+    'DROP TRIGGER IF EXISTS jobs_jobvacancy_fts_ai',
+    'DROP TRIGGER IF EXISTS jobs_jobvacancy_fts_ad',
+    'DROP TRIGGER IF EXISTS jobs_jobvacancy_fts_au',
+    'DROP TABLE IF EXISTS jobs_jobvacancy_fts',
+)
+PG_INDEX_NAME = 'jobs_vacancy_search_gin'
+
+
+def _pg_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(
+        SearchVector('title', 'description', 'skills_required', config='english'), name=PG_INDEX_NAME
+    )
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_INSTALL:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', [PG_INDEX_NAME])
+            if cursor.fetchone() is None:
+                schema_editor.add_index(apps.get_model('jobs', 'JobVacancy'), _pg_index())
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_UNINSTALL:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PG_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_shopstats_jobstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
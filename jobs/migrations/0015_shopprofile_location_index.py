@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_vacancy_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shopprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='jobs_shop_location_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_shopprofile_location_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='jobs_vacancy_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['shop', 'is_active'], name='jobs_vacancy_shop_active_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_jobvacancy_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobvacancy',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='thumbnails/job_images/'),
+        ),
+        migrations.AddField(
+            model_name='shopprofile',
+            name='logo_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='thumbnails/shop_logos/'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_photo_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='thumbnails/profile_photos/'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:31
+
+import django.db.models.deletion
+import jobs.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_cvupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredCV',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(storage=jobs.models.select_raw_storage, upload_to='cvs/')),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='cvupload',
+            name='digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='stored_cv',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applications', to='jobs.storedcv'),
+        ),
+    ]
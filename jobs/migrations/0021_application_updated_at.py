@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last changed no earlier than they were created
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    JobApplication.objects.update(updated_at=F('applied_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_stored_cv'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['applicant', 'updated_at'], name='jobs_application_updated_idx'),
+        ),
+    ]
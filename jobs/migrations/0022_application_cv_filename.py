@@ -0,0 +1,27 @@
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def backfill_cv_filename(apps, schema_editor):
+    # The stored name belongs to the earliest application using each CV;
+    # the names the others uploaded it under were not kept
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    first = JobApplication.objects.filter(stored_cv__isnull=False).values('stored_cv').annotate(first_id=Min('id'))
+    for application in JobApplication.objects.filter(pk__in=first.values('first_id')).select_related('stored_cv').iterator():
+        JobApplication.objects.filter(pk=application.pk).update(cv_filename=application.stored_cv.filename)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_application_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_filename',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_cv_filename, migrations.RunPython.noop),
+    ]
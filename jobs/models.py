@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 class User(AbstractUser):
@@ -9,6 +12,7 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='JOB_SEEKER')
     mobile_number = models.CharField(max_length=20, blank=True, null=True)
     profile_photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    profile_photo_thumb = models.ImageField(upload_to='thumbnails/profile_photos/', blank=True, null=True, editable=False)
 
 class ShopProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='shop_profile')
@@ -18,9 +22,15 @@ class ShopProfile(models.Model):
     latitude = models.FloatField(blank=True, null=True)
     longitude = models.FloatField(blank=True, null=True)
     logo = models.ImageField(upload_to='shop_logos/', blank=True, null=True)
+    logo_thumb = models.ImageField(upload_to='thumbnails/shop_logos/', blank=True, null=True, editable=False)
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='jobs_shop_location_idx'),
+        ]
+
     def __str__(self):
         return self.company_name
 
@@ -42,10 +52,18 @@ class JobVacancy(models.Model):
     education_required = models.CharField(max_length=255)
     salary_range = models.CharField(max_length=100, blank=True, null=True)
     image = models.ImageField(upload_to='job_images/', blank=True, null=True)
+    image_thumb = models.ImageField(upload_to='thumbnails/job_images/', blank=True, null=True, editable=False)
     is_active = models.BooleanField(default=True)
     views = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='jobs_vacancy_created_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'], name='jobs_vacancy_active_idx'),
+            models.Index(fields=['shop', 'is_active'], name='jobs_vacancy_shop_active_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.shop.company_name}"
 
@@ -54,6 +72,19 @@ from django.core.files.storage import storages
 def select_raw_storage():
     return storages['raw_media']
 
+class StoredCV(models.Model):
+    """A CV file stored once per content digest and shared by every application using it."""
+    digest = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='cvs/', storage=select_raw_storage)
+    # Name of the upload that stored it; every application keeps its own
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.digest[:12]})"
+
 class JobApplication(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
@@ -66,14 +97,49 @@ class JobApplication(models.Model):
     meets_requirements = models.BooleanField(default=False)
     contact_number = models.CharField(max_length=20, blank=True, null=True)
     cv = models.FileField(upload_to='cvs/', blank=True, null=True, storage=select_raw_storage)
+    stored_cv = models.ForeignKey(StoredCV, on_delete=models.PROTECT, blank=True, null=True, related_name='applications')
+    # Name of the CV as this applicant uploaded it
+    cv_filename = models.CharField(max_length=255, blank=True, default='')
     notes = models.TextField(blank=True, null=True)
     owner_note = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     applied_at = models.DateTimeField(auto_now_add=True)
+    # Bulk updates bypass auto_now and must set this themselves
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['applicant', 'updated_at'], name='jobs_application_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.applicant.username} for {self.job.title}"
 
+class CVUpload(models.Model):
+    """A resumable CV upload, assembled chunk by chunk in staging storage."""
+    STATUS_CHOICES = (
+        ('UPLOADING', 'Uploading'),
+        ('COMPLETE', 'Complete'),
+        ('USED', 'Used'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cv_uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='UPLOADING')
+    # SHA-256 of the content, set when the upload is finalized
+    digest = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def staged_name(self):
+        return f'uploads/{self.pk}.part'
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
 class VacancyComment(models.Model):
     job = models.ForeignKey(JobVacancy, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -83,3 +149,59 @@ class VacancyComment(models.Model):
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.job.title}"
+
+class JobStats(models.Model):
+    """Rollup of views and application counts for a vacancy, kept up to date incrementally."""
+    job = models.OneToOneField(JobVacancy, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    shop = models.ForeignKey(ShopProfile, on_delete=models.CASCADE, related_name='job_stats')
+    views = models.IntegerField(default=0)
+    applications = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for job {self.job_id}"
+
+class ShopStats(models.Model):
+    """Rollup of the analytics dashboard totals for a shop."""
+    shop = models.OneToOneField(ShopProfile, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    jobs = models.IntegerField(default=0)
+    views = models.IntegerField(default=0)
+    applications = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for shop {self.shop_id}"
+
+class Task(models.Model):
+    """A unit of background work, run by the ``run_tasks`` worker."""
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Lease of a running task; once it expires another worker may retry it
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='jobs_task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
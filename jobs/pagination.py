@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+from .filters import DEFAULT_VACANCY_ORDERING, vacancy_ordering
+
+
+class JobCursorPagination(CursorPagination):
+    # Keyset pagination over (created_at, id) so the cost of a page does not
+    # grow with the number of vacancies in the table.
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = DEFAULT_VACANCY_ORDERING
+
+    def get_ordering(self, request, queryset, view):
+        return vacancy_ordering(request.query_params)
+
+
+class ApplicationCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-applied_at', '-id')
+
+
+class RankedResultsPagination(LimitOffsetPagination):
+    # Used when results are ordered by relevance rather than by creation
+    # time, which keyset pagination cannot express.
+    default_limit = 20
+    max_limit = 100
@@ -0,0 +1,121 @@
+"""
+A small database-backed task queue.
+
+``enqueue`` stores a ``Task`` row in the caller's transaction, so work is
+only queued if the change that caused it commits. The ``run_tasks`` worker
+claims due tasks with a conditional ``UPDATE`` (whichever worker's update
+matches the row wins, no row locks needed), runs them, and retries failures
+with exponential backoff. A claimed task holds a lease; if its worker dies
+the lease expires and the task is picked up again.
+
+With ``TASKS_ALWAYS_EAGER`` set, tasks run in-process once the transaction
+commits instead, which suits development without a worker.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker may hold a task before another worker retries it
+LEASE_SECONDS = 300
+# Retry delays grow as BACKOFF_BASE * 2 ** (attempt - 1), up to BACKOFF_MAX
+BACKOFF_BASE = 10
+BACKOFF_MAX = 3600
+
+_registry = {}
+
+
+def register(name):
+    """Register the decorated function as the handler of tasks called ``name``."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def _always_eager():
+    return getattr(settings, 'TASKS_ALWAYS_EAGER', False)
+
+
+def _run_eagerly(name, payload):
+    try:
+        _registry[name](**payload)
+    except Exception:
+        logger.exception('Task %s failed', name)
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=5):
+    """Queue ``name`` to run with keyword arguments ``payload`` after the current transaction commits."""
+    if name not in _registry:
+        raise ValueError(f'Unknown task: {name}')
+    payload = payload or {}
+    if _always_eager():
+        transaction.on_commit(lambda: _run_eagerly(name, payload))
+        return None
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _due(now):
+    return Q(status='QUEUED', run_at__lte=now) | Q(status='RUNNING', locked_until__lt=now)
+
+
+def claim(limit):
+    """Claim up to ``limit`` due tasks for this worker and return them."""
+    now = timezone.now()
+    candidates = Task.objects.filter(_due(now)).order_by('run_at', 'id').values_list('pk', flat=True)
+    claimed = []
+    for pk in candidates[:limit * 2]:
+        # The WHERE clause is re-checked by the UPDATE, so only one worker wins
+        won = Task.objects.filter(_due(now), pk=pk).update(
+            status='RUNNING',
+            locked_until=now + timedelta(seconds=LEASE_SECONDS),
+            attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at', 'id'))
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def run_task(task):
+    """Run a claimed task and record the outcome. Returns the final status."""
+    handler = _registry.get(task.name)
+    if handler is None:
+        Task.objects.filter(pk=task.pk).update(
+            status='FAILED', last_error=f'Unknown task: {task.name}', finished_at=timezone.now()
+        )
+        return 'FAILED'
+    try:
+        handler(**task.payload)
+    except Exception as exc:
+        logger.exception('Task %s (%s) failed on attempt %d', task.name, task.pk, task.attempts)
+        error = f'{type(exc).__name__}: {exc}'
+        if task.attempts >= task.max_attempts:
+            Task.objects.filter(pk=task.pk).update(status='FAILED', last_error=error, finished_at=timezone.now())
+            return 'FAILED'
+        Task.objects.filter(pk=task.pk).update(
+            status='QUEUED',
+            last_error=error,
+            locked_until=None,
+            run_at=timezone.now() + timedelta(seconds=backoff(task.attempts)),
+        )
+        return 'QUEUED'
+    Task.objects.filter(pk=task.pk).update(status='DONE', locked_until=None, finished_at=timezone.now())
+    return 'DONE'
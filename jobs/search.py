@@ -0,0 +1,117 @@
+"""
+Ranked full-text search over vacancy titles, descriptions and skills.
+
+SQLite (local development) uses an external-content FTS5 table kept in sync
+by triggers. PostgreSQL uses a GIN index over the same ``SearchVector``
+expression that the search query filters on, so the planner can use it.
+Migration 0014 creates both.
+Other backends fall back to unindexed ``icontains`` matching.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'jobs_jobvacancy_fts'
+SEARCH_FIELDS = ('title', 'description', 'skills_required')
+# bm25 column weights: title matches count most, then skills, then description
+SQLITE_WEIGHTS = (10.0, 1.0, 5.0)
+
+_SQLITE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON jobs_jobvacancy BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills_required)
+        VALUES (new.id, new.title, new.description, new.skills_required);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON jobs_jobvacancy BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills_required)
+        VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+    END
+    """,
+    # Only text changes touch the index; view count updates do not
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, description, skills_required ON jobs_jobvacancy BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills_required)
+        VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills_required)
+        VALUES (new.id, new.title, new.description, new.skills_required);
+    END
+    """,
+)
+
+
+def _pg_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*SEARCH_FIELDS, config='english')
+
+
+def ensure_sqlite_triggers(connection):
+    """
+    Recreate missing sync triggers and reindex.
+
+    SQLite drops a table's triggers when a schema migration rebuilds the
+    table, so this also runs after every ``migrate``.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{FTS_TABLE}_%'],
+        )
+        if cursor.fetchone()[0] == len(_SQLITE_TRIGGERS):
+            return
+        for statement in _SQLITE_TRIGGERS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _fts_query(text):
+    # Quote every term so user input can never be parsed as FTS syntax, and
+    # prefix-match it so partially typed words still find results
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_vacancies(queryset, text):
+    """
+    Filter ``queryset`` to vacancies matching ``text``, annotated with a
+    ``search_rank`` (higher is better) and ordered by it.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = _fts_query(text)
+        if not match:
+            return queryset.none()
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        table = queryset.model._meta.db_table
+        # Joined once, so bm25 is read from the match rather than from a
+        # subquery run again for every row
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-bm25({FTS_TABLE}, {weights})'},
+        ).order_by('-search_rank', '-id')
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        vector = _pg_vector()
+        query = SearchQuery(text, config='english', search_type='websearch')
+        return queryset.annotate(
+            search=vector, search_rank=SearchRank(vector, query)
+        ).filter(search=query).order_by('-search_rank', '-id')
+
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return queryset.none()
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term) | Q(skills_required__icontains=term)
+    return queryset.filter(condition).order_by('-created_at', '-id')
@@ -1,7 +1,12 @@
+from collections import defaultdict
+from django.db import models
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment
+from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment, CVUpload, StoredCV
+
+def file_url(file):
+    return file.url if file else None
 
 class UserSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(write_only=True, required=False)
@@ -11,10 +16,11 @@ class UserSerializer(serializers.ModelSerializer):
     longitude = serializers.FloatField(write_only=True, required=False, allow_null=True)
     logo = serializers.ImageField(write_only=True, required=False, allow_null=True)
     profile_photo = serializers.SerializerMethodField()
+    profile_photo_thumb = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'role', 'password', 'mobile_number', 'profile_photo', 'company_name', 'description', 'location', 'latitude', 'longitude', 'logo')
+        fields = ('id', 'username', 'email', 'role', 'password', 'mobile_number', 'profile_photo', 'profile_photo_thumb', 'company_name', 'description', 'location', 'latitude', 'longitude', 'logo')
         extra_kwargs = {'password': {'write_only': True}}
 
     def validate_password(self, value):
@@ -29,6 +35,9 @@ class UserSerializer(serializers.ModelSerializer):
             return obj.profile_photo.url
         return None
 
+    def get_profile_photo_thumb(self, obj):
+        return file_url(obj.profile_photo_thumb)
+
     def create(self, validated_data):
         company_name = validated_data.pop('company_name', None)
         description = validated_data.pop('description', None)
@@ -58,16 +67,80 @@ class UserSerializer(serializers.ModelSerializer):
 class ShopProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     logo = serializers.SerializerMethodField()
+    logo_thumb = serializers.SerializerMethodField()
+    # Only set when the shops were filtered with ?near=
+    distance_km = serializers.FloatField(read_only=True, required=False)
 
     class Meta:
         model = ShopProfile
-        fields = ('id', 'user', 'company_name', 'description', 'location', 'latitude', 'longitude', 'logo', 'is_verified', 'created_at')
+        fields = ('id', 'user', 'company_name', 'description', 'location', 'latitude', 'longitude', 'logo', 'logo_thumb', 'is_verified', 'created_at', 'distance_km')
 
     def get_logo(self, obj):
         if obj.logo:
             return obj.logo.url
         return None
 
+    def get_logo_thumb(self, obj):
+        return file_url(obj.logo_thumb)
+
+def index_comment_replies(comments):
+    """
+    Link each comment to its replies in memory and return the top-level
+    comments grouped by job id. ``comments`` must be a list ordered by id.
+    """
+    by_id = {}
+    top_level = defaultdict(list)
+    for comment in comments:
+        comment._reply_list = []
+        by_id[comment.id] = comment
+    for comment in comments:
+        if comment.parent_id is None:
+            top_level[comment.job_id].append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id]._reply_list.append(comment)
+    return top_level
+
+def _fetch_comments(job_ids):
+    return list(
+        VacancyComment.objects.filter(job_id__in=job_ids).select_related('user').order_by('id')
+    )
+
+def attach_comment_trees(jobs):
+    """Load the comment trees of all ``jobs`` with a single query."""
+    jobs = [job for job in jobs if not hasattr(job, '_comment_tree')]
+    if not jobs:
+        return
+    top_level = index_comment_replies(_fetch_comments({job.id for job in jobs}))
+    for job in jobs:
+        job._comment_tree = top_level.get(job.id, [])
+
+def attach_reply_trees(comments):
+    """Load the reply trees below ``comments`` with a single query."""
+    comments = [comment for comment in comments if not hasattr(comment, '_reply_list')]
+    if not comments:
+        return
+    fetched = _fetch_comments({comment.job_id for comment in comments})
+    index_comment_replies(fetched)
+    replies = {comment.id: comment._reply_list for comment in fetched}
+    for comment in comments:
+        comment._reply_list = replies.get(comment.id, [])
+
+class _PrefetchingListSerializer(serializers.ListSerializer):
+    # Subclasses set ``prefetch`` to a function that loads everything the
+    # child serializer needs for the whole list up front.
+    prefetch = None
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.prefetch(items)
+        return super().to_representation(items)
+
+class VacancyCommentListSerializer(_PrefetchingListSerializer):
+    prefetch = staticmethod(attach_reply_trees)
+
+class JobVacancyListSerializer(_PrefetchingListSerializer):
+    prefetch = staticmethod(attach_comment_trees)
+
 class VacancyCommentSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     replies = serializers.SerializerMethodField()
@@ -76,14 +149,15 @@ class VacancyCommentSerializer(serializers.ModelSerializer):
         model = VacancyComment
         fields = ('id', 'job', 'user', 'text', 'parent', 'created_at', 'replies')
         read_only_fields = ('user', 'job')
+        list_serializer_class = VacancyCommentListSerializer
 
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return VacancyCommentSerializer(obj.replies.all(), many=True).data
-        return []
+        attach_reply_trees([obj])
+        return [self.to_representation(reply) for reply in obj._reply_list]
 
 class JobVacancySerializer(serializers.ModelSerializer):
     shop = ShopProfileSerializer(read_only=True)
+    image_thumb = serializers.SerializerMethodField()
     comments = serializers.SerializerMethodField()
 
     class Meta:
@@ -91,13 +165,47 @@ class JobVacancySerializer(serializers.ModelSerializer):
         fields = (
             'id', 'shop', 'title', 'job_type', 'description', 'skills_required', 
             'experience_required', 'education_required', 'salary_range', 'image',
-            'is_active', 'created_at', 'comments'
+            'image_thumb', 'is_active', 'created_at', 'comments'
         )
+        list_serializer_class = JobVacancyListSerializer
+
+    def get_image_thumb(self, obj):
+        return file_url(obj.image_thumb)
 
     def get_comments(self, obj):
-        # Only serialize top-level comments
-        top_level_comments = obj.comments.filter(parent__isnull=True)
-        return VacancyCommentSerializer(top_level_comments, many=True).data
+        # Only serialize top-level comments; replies are nested below them
+        attach_comment_trees([obj])
+        return VacancyCommentSerializer(obj._comment_tree, many=True).data
+
+class JobVacancyCardSerializer(serializers.ModelSerializer):
+    """Compact representation used by the job listing feed."""
+    shop_name = serializers.CharField(source='shop.company_name', read_only=True)
+    shop_logo = serializers.SerializerMethodField()
+    shop_logo_thumb = serializers.SerializerMethodField()
+    image_thumb = serializers.SerializerMethodField()
+    # Only set when the jobs were filtered with ?near=
+    distance_km = serializers.FloatField(read_only=True, required=False)
+
+    class Meta:
+        model = JobVacancy
+        fields = (
+            'id', 'title', 'job_type', 'salary_range', 'shop_name', 'shop_logo', 'shop_logo_thumb',
+            'image_thumb', 'created_at', 'distance_km'
+        )
+
+    def get_shop_logo(self, obj):
+        if obj.shop.logo:
+            return obj.shop.logo.url
+        return None
+
+    def get_shop_logo_thumb(self, obj):
+        return file_url(obj.shop.logo_thumb)
+
+    def get_image_thumb(self, obj):
+        return file_url(obj.image_thumb)
+
+class JobApplicationListSerializer(_PrefetchingListSerializer):
+    prefetch = staticmethod(lambda applications: attach_comment_trees([app.job for app in applications]))
 
 class JobApplicationSerializer(serializers.ModelSerializer):
     applicant = UserSerializer(read_only=True)
@@ -107,6 +215,43 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         model = JobApplication
         fields = (
             'id', 'job', 'job_details', 'applicant', 'meets_requirements', 
-            'contact_number', 'cv', 'notes', 'owner_note', 'status', 'applied_at'
+            'contact_number', 'cv', 'cv_filename', 'stored_cv', 'notes', 'owner_note', 'status', 'applied_at', 'updated_at'
+        )
+        # CVs only arrive through apply, which stores them by digest
+        read_only_fields = ('applicant', 'job', 'cv', 'cv_filename', 'stored_cv')
+        list_serializer_class = JobApplicationListSerializer
+
+class ApplicantSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'mobile_number')
+
+class JobApplicationCompactSerializer(serializers.ModelSerializer):
+    """
+    Application without the nested vacancy; ``job`` is an id into the
+    ``jobs`` side-table returned alongside the list.
+    """
+    applicant = ApplicantSummarySerializer(read_only=True)
+
+    class Meta:
+        model = JobApplication
+        fields = (
+            'id', 'job', 'applicant', 'meets_requirements',
+            'contact_number', 'cv', 'cv_filename', 'stored_cv', 'notes', 'owner_note', 'status', 'applied_at', 'updated_at'
         )
-        read_only_fields = ('applicant', 'job')
+        read_only_fields = fields
+
+class CVUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CVUpload
+        fields = ('id', 'filename', 'content_type', 'size', 'received', 'status', 'created_at')
+        read_only_fields = ('received', 'status')
+
+class StoredCVSerializer(serializers.ModelSerializer):
+    # The name the requesting seeker uploaded it under (see cvstore.owned_by)
+    filename = serializers.CharField(source='own_filename', read_only=True)
+
+    class Meta:
+        model = StoredCV
+        fields = ('id', 'filename', 'size', 'file', 'created_at')
+        read_only_fields = fields
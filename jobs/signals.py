@@ -0,0 +1,165 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import authentication, cache, cvstore, events, images, search, stats
+from .models import JobApplication, JobVacancy, ShopProfile, ShopStats, User, VacancyComment
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    # Lets post_save tell whether the status changed without another query
+    instance._saved_status = instance.status
+
+
+def _job_owner_id(instance):
+    # Views usually hold the job and shop already; avoid a query if so
+    if type(instance).job.is_cached(instance) and JobVacancy.shop.is_cached(instance.job):
+        return instance.job.shop.user_id
+    return JobVacancy.objects.filter(pk=instance.job_id).values_list('shop__user_id', flat=True).first()
+
+
+@receiver(post_save, sender=JobApplication)
+def publish_application_event(sender, instance, created, **kwargs):
+    # Connected before track_application_saved, which resets _saved_status
+    previous_status = None if created else instance._saved_status
+    if created or previous_status != instance.status:
+        events.application_changed(
+            instance.pk, instance.job_id, instance.status, previous_status, instance.applicant_id, _job_owner_id(instance)
+        )
+
+
+@receiver(post_save, sender=JobApplication)
+def track_application_saved(sender, instance, created, **kwargs):
+    if created:
+        stats.application_created(instance.job_id, instance.status)
+    else:
+        stats.status_changed(instance.job_id, instance._saved_status, instance.status)
+    instance._saved_status = instance.status
+
+
+@receiver(post_delete, sender=JobApplication)
+def track_application_deleted(sender, instance, **kwargs):
+    stats.application_deleted(instance.job_id, instance._saved_status)
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_stored_cv(sender, instance, **kwargs):
+    if instance.stored_cv_id:
+        cvstore.release(instance.stored_cv_id)
+
+
+@receiver(post_save, sender=JobVacancy)
+def track_vacancy_created(sender, instance, created, **kwargs):
+    if created:
+        stats.job_created(instance)
+
+
+@receiver(pre_delete, sender=JobVacancy)
+def track_vacancy_deleted(sender, instance, **kwargs):
+    # Before the cascade removes the job's rollup row
+    stats.job_deleting(instance)
+
+
+@receiver(post_save, sender=ShopProfile)
+def create_shop_stats(sender, instance, created, **kwargs):
+    if created:
+        ShopStats.objects.get_or_create(shop=instance)
+
+
+def _image_name(value):
+    return getattr(value, 'name', value) or None
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=ShopProfile)
+@receiver(post_init, sender=JobVacancy)
+def remember_images(sender, instance, **kwargs):
+    # Read the raw attribute: deferred fields must not trigger a query here
+    instance._saved_images = {
+        field: _image_name(instance.__dict__[field])
+        for field in images.source_fields(sender) if field in instance.__dict__
+    }
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ShopProfile)
+@receiver(post_save, sender=JobVacancy)
+def process_changed_images(sender, instance, created, **kwargs):
+    for field in images.source_fields(sender):
+        if field not in instance.__dict__:
+            continue
+        name = _image_name(instance.__dict__[field])
+        if name != instance._saved_images.get(field):
+            images.schedule(instance, field)
+            instance._saved_images[field] = name
+
+
+def ensure_search_triggers(using, **kwargs):
+    # Connected to post_migrate in JobsConfig.ready()
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        search.ensure_sqlite_triggers(connection)
+
+
+@receiver(post_save, sender=JobVacancy)
+@receiver(post_delete, sender=JobVacancy)
+def invalidate_vacancy(sender, instance, **kwargs):
+    cache.bump(cache.version_key('jobs'), cache.version_key('job', instance.pk))
+
+
+@receiver(post_save, sender=ShopProfile)
+@receiver(post_delete, sender=ShopProfile)
+def invalidate_shop(sender, instance, **kwargs):
+    # Job cards and details embed the shop, so job lists go stale too
+    cache.bump(cache.version_key('shops'), cache.version_key('shop', instance.pk), cache.version_key('jobs'))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_shop_owner(sender, instance, **kwargs):
+    if instance.role != 'SHOP_OWNER':
+        return
+    keys = [cache.version_key('shops'), cache.version_key('jobs')]
+    keys += [cache.version_key('shop', pk) for pk in ShopProfile.objects.filter(user_id=instance.pk).values_list('pk', flat=True)]
+    cache.bump(*keys)
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # Read the raw attribute: deferred fields must not trigger a query here
+    instance._saved_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def invalidate_commenter(sender, instance, created, **kwargs):
+    # Comment trees show their authors' usernames, whatever their role
+    if created or instance.__dict__.get('username') == instance._saved_username:
+        return
+    instance._saved_username = instance.username
+    job_ids = set(VacancyComment.objects.filter(user_id=instance.pk).values_list('job_id', flat=True))
+    if job_ids:
+        cache.bump(
+            cache.version_key('comments'), cache.version_key('jobs'),
+            *[cache.version_key('job', pk) for pk in job_ids]
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=ShopProfile)
+@receiver(post_delete, sender=ShopProfile)
+def forget_authenticated_user(sender, instance, **kwargs):
+    authentication.forget(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(post_save, sender=VacancyComment)
+def publish_comment_event(sender, instance, created, **kwargs):
+    if created:
+        events.comment_created(instance, _job_owner_id(instance))
+
+
+@receiver(post_save, sender=VacancyComment)
+@receiver(post_delete, sender=VacancyComment)
+def invalidate_comment(sender, instance, **kwargs):
+    cache.bump(cache.version_key('comments'), cache.version_key('job', instance.job_id))
@@ -0,0 +1,159 @@
+"""
+Incremental maintenance of the ``ShopStats`` / ``JobStats`` rollups that
+back the shop analytics dashboard.
+
+Every change is applied as relative ``F()`` updates so concurrent writers
+never overwrite each other. ``rebuild`` recomputes the rollups from the
+source tables and is used by the ``rebuild_stats`` command and whenever a
+shop has no rollup row yet.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import JobApplication, JobStats, JobVacancy, ShopProfile, ShopStats
+
+# Rollup column holding the number of applications in each status
+STATUS_FIELDS = {code: code.lower() for code, _ in JobApplication.STATUS_CHOICES}
+
+
+def _apply(job_id, **deltas):
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not updates:
+        return
+    job_updates = {field: value for field, value in updates.items() if field != 'jobs'}
+    if job_updates:
+        JobStats.objects.filter(pk=job_id).update(**job_updates)
+    ShopStats.objects.filter(shop__vacancies__id=job_id).update(**updates)
+
+
+def job_created(job):
+    JobStats.objects.get_or_create(job_id=job.pk, defaults={'shop_id': job.shop_id})
+    ShopStats.objects.filter(pk=job.shop_id).update(jobs=F('jobs') + 1)
+
+
+def job_deleting(job):
+    """
+    Take the job out of its shop's totals, before its rollup row is deleted
+    along with it. The job's applications are subtracted as they are deleted.
+    """
+    # The rollup row holds exactly the views added to the shop; the instance
+    # may predate later flushes. Locked so no flush adds to it in between
+    views = JobStats.objects.select_for_update().filter(pk=job.pk).values_list('views', flat=True).first() or 0
+    ShopStats.objects.filter(pk=job.shop_id).update(jobs=F('jobs') - 1, views=F('views') - views)
+
+
+def application_created(job_id, status):
+    _apply(job_id, applications=1, **{STATUS_FIELDS[status]: 1})
+
+
+def application_deleted(job_id, status):
+    _apply(job_id, applications=-1, **{STATUS_FIELDS[status]: -1})
+
+
+def status_changed(job_id, old_status, new_status, count=1):
+    if old_status == new_status or not count:
+        return
+    deltas = Counter()
+    deltas[STATUS_FIELDS[old_status]] -= count
+    deltas[STATUS_FIELDS[new_status]] += count
+    _apply(job_id, **deltas)
+
+
+def _application_counts(applications, group_by):
+    counts = {
+        f'n_{field}': Count('pk', filter=Q(status=code)) for code, field in STATUS_FIELDS.items()
+    }
+    rows = applications.values(group_by).annotate(n_applications=Count('pk'), **counts).order_by()
+    return {row[group_by]: row for row in rows}
+
+
+def recount(job_ids):
+    """
+    Set the application counts of the given jobs, and of their shops, from
+    the applications themselves. Unlike the relative updates this gives the
+    same result however often it runs, so a retried task can use it.
+    """
+    counted = ['applications', *STATUS_FIELDS.values()]
+    with transaction.atomic():
+        # Locked in the order the signal handlers update them: jobs, then shops
+        shop_ids = sorted(set(
+            JobStats.objects.select_for_update().filter(pk__in=job_ids).order_by('pk').values_list('shop_id', flat=True)
+        ))
+        list(ShopStats.objects.select_for_update().filter(pk__in=shop_ids).order_by('pk').values_list('pk'))
+        for model, ids, applications, group_by in (
+            (JobStats, job_ids, JobApplication.objects.filter(job_id__in=job_ids), 'job_id'),
+            (ShopStats, shop_ids, JobApplication.objects.filter(job__shop_id__in=shop_ids), 'job__shop_id'),
+        ):
+            counts = _application_counts(applications, group_by)
+            for pk in ids:
+                row = counts.get(pk, {})
+                model.objects.filter(pk=pk).update(**{field: row.get(f'n_{field}', 0) for field in counted})
+
+
+def views_recorded(counts):
+    """Apply a batch of flushed view increments, given as ``{job_id: n}``."""
+    if not counts:
+        return
+    per_shop = Counter()
+    for job_id, shop_id in list(JobStats.objects.filter(pk__in=counts).values_list('pk', 'shop_id')):
+        # A job deleted in the meantime has already left its shop's totals
+        if JobStats.objects.filter(pk=job_id).update(views=F('views') + counts[job_id]):
+            per_shop[shop_id] += counts[job_id]
+    for shop_id, count in per_shop.items():
+        ShopStats.objects.filter(pk=shop_id).update(views=F('views') + count)
+
+
+def rebuild(shop_ids=None):
+    """Recompute the rollups of the given shops (all shops by default)."""
+    shops = ShopProfile.objects.all()
+    jobs = JobVacancy.objects.all()
+    if shop_ids is not None:
+        shops = shops.filter(pk__in=shop_ids)
+        jobs = jobs.filter(shop_id__in=shop_ids)
+
+    # Annotation names must not shadow the ``applications`` relation
+    rows = (
+        jobs.values('id', 'shop_id', 'views')
+        .annotate(
+            n_applications=Count('applications'),
+            **{
+                f'n_{field}': Count('applications', filter=Q(applications__status=code))
+                for code, field in STATUS_FIELDS.items()
+            }
+        )
+        .order_by()
+    )
+    counted = ['applications', *STATUS_FIELDS.values()]
+
+    with transaction.atomic():
+        shop_pks = list(shops.values_list('pk', flat=True))
+        JobStats.objects.filter(shop_id__in=shop_pks).delete()
+        ShopStats.objects.filter(shop_id__in=shop_pks).delete()
+
+        totals = defaultdict(Counter)
+        job_stats = []
+        for row in rows.iterator(chunk_size=2000):
+            values = {'views': row['views'], **{field: row[f'n_{field}'] for field in counted}}
+            totals[row['shop_id']].update(jobs=1, **values)
+            job_stats.append(JobStats(job_id=row['id'], shop_id=row['shop_id'], **values))
+        JobStats.objects.bulk_create(job_stats, batch_size=1000)
+        ShopStats.objects.bulk_create(
+            [ShopStats(shop_id=pk, **totals[pk]) for pk in shop_pks], batch_size=1000
+        )
+    return len(shop_pks)
+
+
+def get_shop_stats(shop):
+    """Return the rollup row for ``shop``, building it on first access."""
+    try:
+        return ShopStats.objects.get(pk=shop.pk)
+    except ShopStats.DoesNotExist:
+        pass
+    try:
+        rebuild([shop.pk])
+    except IntegrityError:
+        # Another request rebuilt the same shop concurrently
+        pass
+    return ShopStats.objects.get(pk=shop.pk)
@@ -0,0 +1,225 @@
+"""
+Synthetic data for local development, benchmarks and load tests.
+
+``generate`` fills the database with shops spread around a point,
+vacancies, job seekers, applications and nested comment threads. Rows are
+built in batches and written with ``bulk_create``, each batch in its own
+transaction, so memory use stays flat and millions of rows load in
+minutes. Model signals do not run for bulk inserts; the analytics rollups
+are rebuilt once at the end instead. The same ``seed`` always produces the
+same dataset, and usernames include it, so datasets with different seeds
+can live side by side.
+"""
+import math
+import random
+from array import array
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import cache, stats
+from .geo import EARTH_RADIUS_KM
+from .models import JobApplication, JobVacancy, ShopProfile, User, VacancyComment
+
+PASSWORD = 'ComplexPass123!'
+BATCH_SIZE = 1000
+# Midtown Manhattan
+CENTER = (40.7580, -73.9855)
+
+FIRST_NAMES = ('Alex', 'Sam', 'Priya', 'Jordan', 'Maria', 'Chen', 'Fatima', 'Diego', 'Aisha', 'Liam', 'Noor', 'Kenji')
+LAST_NAMES = ('Smith', 'Garcia', 'Patel', 'Kim', 'Okafor', 'Nguyen', 'Rossi', 'Cohen', 'Silva', 'Murphy', 'Haddad')
+STREETS = ('Main Street', 'Oak Avenue', 'Market Street', 'Park Road', 'High Street', 'River Lane', 'Station Road')
+
+# kind: (name patterns, description, [(title, job type, skills, experience, education, salary)])
+SHOP_KINDS = {
+    'cafe': (
+        ('{name} Coffee', 'Sunrise {name} Cafe', '{name} Espresso Bar'),
+        'A local coffee shop known for its roasts, friendly atmosphere and morning pastries.',
+        [
+            ('Lead Barista', 'FULL_TIME', 'Latte art, espresso calibration, customer service', '2-3 Years', 'High School Diploma', '$18 - $22 / hr'),
+            ('Weekend Cashier', 'PART_TIME', 'Cash handling, punctuality, friendly demeanor', 'Entry Level', 'High School Student / Graduate', '$15 / hr'),
+            ('Pastry Cook', 'ON_SITE', 'Baking, food safety, early mornings', '1 Year', 'Culinary Certificate', '$17 - $20 / hr'),
+        ],
+    ),
+    'repair': (
+        ('{name} Electronics Repair', 'Quantum {name} Tech', '{name} Phone Fix'),
+        'Neighbourhood tech experts repairing everything from smartphones to vintage audio equipment.',
+        [
+            ('Junior Mobile Technician', 'FULL_TIME', 'Screen replacements, battery swaps, micro-soldering', '1 Year', 'Vocational Training', '$40,000 - $50,000 / yr'),
+            ('Customer Intake Specialist', 'CONTRACT', 'Communication, ticketing systems, typing', 'None', 'High School Diploma', '$17 / hr'),
+            ('Remote Support Agent', 'REMOTE', 'Troubleshooting, patience, written English', '1-2 Years', 'High School Diploma', '$19 / hr'),
+        ],
+    ),
+    'gym': (
+        ('Iron {name} Athletics', '{name} Fitness Club', '{name} Strength Studio'),
+        'A fitness centre focused on strength training and high-intensity classes.',
+        [
+            ('Certified Personal Trainer', 'PART_TIME', 'NASM, ACE or ISSA certification, CPR/AED', 'Certification Required', 'Related Degree / Certs', '$35 / hr'),
+            ('Front Desk Associate', 'PART_TIME', 'Customer service, scheduling, sales', 'Entry Level', 'High School Diploma', '$16 / hr'),
+        ],
+    ),
+    'grocery': (
+        ('{name} Market', '{name} Fresh Grocers', 'Corner {name} Foods'),
+        'A family-run grocery stocking fresh produce, local bread and everyday essentials.',
+        [
+            ('Stock Clerk', 'FULL_TIME', 'Inventory, lifting, attention to detail', 'Entry Level', 'None', '$16 / hr'),
+            ('Delivery Driver', 'HYBRID', 'Clean driving licence, route planning', '1 Year', 'High School Diploma', '$18 / hr + tips'),
+            ('Store Supervisor', 'FULL_TIME', 'Team leadership, cash reconciliation, scheduling', '3+ Years', 'Associate Degree', '$45,000 - $55,000 / yr'),
+        ],
+    ),
+    'books': (
+        ('{name} Books', 'The {name} Bookshop', '{name} Pages & Co'),
+        'An independent bookshop hosting readings, a children\'s corner and a small cafe.',
+        [
+            ('Bookseller', 'PART_TIME', 'Reading widely, recommendations, cash handling', 'Entry Level', 'High School Diploma', '$16 / hr'),
+            ('Events Coordinator', 'CONTRACT', 'Event planning, social media, author relations', '2 Years', 'Bachelor\'s Degree', '$22 / hr'),
+        ],
+    ),
+}
+QUESTIONS = ('Is this role still open?', 'Are the hours flexible?', 'Is weekend work required?', 'Do you offer training?')
+ANSWERS = ('Yes, please apply!', 'We can discuss that at the interview.', 'Training is provided for the right candidate.')
+FOLLOW_UPS = ('Thanks, I just applied.', 'Great, thank you!', 'Good to know.')
+
+
+def _point_near(rng, center, radius_km):
+    # Uniform over the disc; the sqrt keeps the edge as dense as the middle
+    distance = radius_km * math.sqrt(rng.random())
+    bearing = rng.random() * 2 * math.pi
+    lat = center[0] + math.degrees(distance * math.cos(bearing) / EARTH_RADIUS_KM)
+    lng = center[1] + math.degrees(distance * math.sin(bearing) / EARTH_RADIUS_KM) / math.cos(math.radians(center[0]))
+    return round(lat, 6), round(lng, 6)
+
+
+def _batches(total, size):
+    for start in range(0, total, size):
+        yield range(start, min(start + size, total))
+
+
+def _person(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def generate(shops=10, jobs_per_shop=5, seekers=50, applications_per_seeker=3, comment_trees=2,
+             comment_depth=3, seed=0, center=CENTER, radius_km=25.0, batch_size=BATCH_SIZE, progress=None):
+    """
+    Create the dataset and return how many rows of each kind were made.
+    Each comment tree is a question followed by alternating answers from the
+    shop and the asker, ``comment_depth`` comments deep. ``progress`` is
+    called with a message after each table is written.
+    """
+    rng = random.Random(seed)
+    report = progress or (lambda message: None)
+    # Hashing is deliberately slow; every synthetic user shares one hash
+    password = make_password(PASSWORD)
+    kinds = list(SHOP_KINDS)
+
+    # Only ids are kept between batches, in compact arrays
+    job_ids, job_owner_ids = array('q'), array('q')
+    for numbers in _batches(shops, batch_size):
+        with transaction.atomic():
+            owners = User.objects.bulk_create(
+                [
+                    User(
+                        username=f'owner_{seed}_{n}', password=password, role='SHOP_OWNER',
+                        first_name=first, last_name=last, email=f'owner_{seed}_{n}@example.com',
+                        mobile_number=f'555{n % 10_000_000:07d}',
+                    )
+                    for n, (first, last) in ((n, _person(rng)) for n in numbers)
+                ],
+                batch_size=batch_size,
+            )
+            shop_kinds = [rng.choice(kinds) for _ in owners]
+            profiles = []
+            for owner, kind in zip(owners, shop_kinds):
+                patterns, description, _ = SHOP_KINDS[kind]
+                latitude, longitude = _point_near(rng, center, radius_km)
+                profiles.append(ShopProfile(
+                    user=owner, company_name=rng.choice(patterns).format(name=owner.last_name),
+                    description=description, location=f'{rng.randint(1, 999)} {rng.choice(STREETS)}',
+                    latitude=latitude, longitude=longitude, is_verified=rng.random() < 0.8,
+                ))
+            ShopProfile.objects.bulk_create(profiles, batch_size=batch_size)
+            vacancies = []
+            for profile, kind in zip(profiles, shop_kinds):
+                roles = SHOP_KINDS[kind][2]
+                for _ in range(jobs_per_shop):
+                    title, job_type, skills, experience, education, salary = rng.choice(roles)
+                    vacancies.append(JobVacancy(
+                        shop=profile, title=title, job_type=job_type,
+                        description=f'{profile.description} Join the team at {profile.company_name} as a {title.lower()}.',
+                        skills_required=skills, experience_required=experience, education_required=education,
+                        salary_range=salary, is_active=rng.random() < 0.9,
+                    ))
+            JobVacancy.objects.bulk_create(vacancies, batch_size=batch_size)
+        for vacancy in vacancies:
+            job_ids.append(vacancy.pk)
+            job_owner_ids.append(vacancy.shop.user_id)
+    report(f'{shops} shops with {len(job_ids)} vacancies')
+
+    statuses = [code for code, _ in JobApplication.STATUS_CHOICES]
+    status_weights = (6, 2, 1, 3)
+    seeker_ids = array('q')
+    applications = 0
+    for numbers in _batches(seekers, batch_size):
+        with transaction.atomic():
+            created = User.objects.bulk_create(
+                [
+                    User(
+                        username=f'seeker_{seed}_{n}', password=password, role='JOB_SEEKER',
+                        first_name=first, last_name=last, email=f'seeker_{seed}_{n}@example.com',
+                    )
+                    for n, (first, last) in ((n, _person(rng)) for n in numbers)
+                ],
+                batch_size=batch_size,
+            )
+            rows = []
+            for seeker in created:
+                seeker_ids.append(seeker.pk)
+                for index in rng.sample(range(len(job_ids)), min(applications_per_seeker, len(job_ids))):
+                    rows.append(JobApplication(
+                        job_id=job_ids[index], applicant_id=seeker.pk, meets_requirements=True,
+                        status=rng.choices(statuses, status_weights)[0],
+                        contact_number=f'555{seeker.pk % 10_000_000:07d}',
+                    ))
+            JobApplication.objects.bulk_create(rows, batch_size=batch_size)
+            applications += len(rows)
+    report(f'{seekers} job seekers with {applications} applications')
+
+    # Threads alternate between the asker and the shop owner, level by level
+    askers = seeker_ids or job_owner_ids
+    comments = 0
+    if comment_trees and comment_depth:
+        jobs_per_batch = max(batch_size // comment_trees, 1)
+        for indexes in _batches(len(job_ids), jobs_per_batch):
+            with transaction.atomic():
+                threads = [
+                    (job_ids[index], job_owner_ids[index], rng.choice(askers))
+                    for index in indexes for _ in range(comment_trees)
+                ]
+                parents = [None] * len(threads)
+                for depth in range(comment_depth):
+                    texts = FOLLOW_UPS if depth % 2 == 0 else ANSWERS
+                    parents = VacancyComment.objects.bulk_create(
+                        [
+                            VacancyComment(
+                                job_id=job_id, user_id=owner_id if depth % 2 else asker_id, parent=parent,
+                                text=rng.choice(QUESTIONS if depth == 0 else texts),
+                            )
+                            for (job_id, owner_id, asker_id), parent in zip(threads, parents)
+                        ],
+                        batch_size=batch_size,
+                    )
+                    comments += len(parents)
+        report(f'{comments} comments')
+
+    stats.rebuild()
+    # Cached public responses predate the new rows
+    cache.bump(cache.version_key('jobs'), cache.version_key('shops'), cache.version_key('comments'))
+    report('Rebuilt the analytics rollups')
+    return {
+        'users': shops + seekers,
+        'shops': shops,
+        'jobs': len(job_ids),
+        'applications': applications,
+        'comments': comments,
+    }
@@ -0,0 +1,88 @@
+"""
+Background tasks. Each handler takes JSON-serializable keyword arguments and
+must be safe to run more than once, since a task is retried when its worker
+fails part-way.
+"""
+import logging
+import os
+import uuid
+
+from django.core.files.storage import storages
+
+from . import cvstore, images, stats
+from .models import JobApplication
+from .queue import enqueue, register
+
+logger = logging.getLogger(__name__)
+
+
+def staging_storage():
+    # Local storage shared by the web and worker processes
+    return storages['staging']
+
+
+def stage_cv(application, upload):
+    """
+    Link an uploaded CV to ``application``. A CV stored before is linked
+    straight away; a new one is written to staging storage and copied to the
+    CV storage by a task, so the request does not wait on the remote backend.
+    """
+    filename = os.path.basename(upload.name)
+    digest = cvstore.sha256_of(upload.chunks())
+    stored = cvstore.find(digest)
+    if stored is not None:
+        cvstore.attach(application, stored, filename)
+        return
+    extension = os.path.splitext(upload.name)[1].lower()
+    upload.seek(0)
+    staged_name = staging_storage().save(f'cvs/{uuid.uuid4().hex}{extension}', upload)
+    store_staged_cv(application, staged_name, filename, digest)
+
+
+def store_staged_cv(application, staged_name, filename, digest):
+    stored = cvstore.find(digest)
+    if stored is not None:
+        cvstore.attach(application, stored, filename)
+        staging_storage().delete(staged_name)
+        return
+    enqueue('store_cv', {
+        'application_id': application.pk,
+        'staged_name': staged_name,
+        'filename': filename,
+        'digest': digest,
+    })
+
+
+@register('store_cv')
+def store_cv(application_id, staged_name, filename, digest=None):
+    staging = staging_storage()
+    if not staging.exists(staged_name):
+        # Already stored by an earlier attempt
+        return
+    if digest is None:
+        # Queued before CVs were content-addressed
+        with staging.open(staged_name, 'rb') as staged:
+            digest = cvstore.sha256_of(staged.chunks())
+    application = JobApplication.objects.filter(pk=application_id).first()
+    if application is not None:
+        with staging.open(staged_name, 'rb') as staged:
+            stored = cvstore.store(staged, filename, digest, staging.size(staged_name))
+        cvstore.attach(application, stored, filename)
+    staging.delete(staged_name)
+
+
+@register('recount_stats')
+def recount_stats(job_ids):
+    """Bring the rollups of jobs changed by a bulk status update up to date."""
+    stats.recount(job_ids)
+
+
+@register('process_image')
+def process_image(label, pk, field_name):
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        images.process_image(label, pk, field_name)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        # Retrying cannot fix a file Pillow refuses to read
+        logger.warning('Skipping %s.%s of %s: %s', label, field_name, pk, exc)
@@ -1,3 +1,1013 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import media
+from . import benchmarks, events, exports, queue, search, stats, synthetic, transitions
+from . import cache as cache_module
+from .counters import ViewCounter, view_counter
+from .models import (
+    CVUpload, User, ShopProfile, JobApplication, JobStats, JobVacancy, ShopStats, StoredCV, Task, VacancyComment,
+)
+from .tasks import staging_storage
+
+
+def tearDownModule():
+    # Views buffered by a test must not outlive the test database
+    view_counter.flush()
+
+
+class CommentTreeQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        self.shop = ShopProfile.objects.create(
+            user=self.owner, company_name='Corner Shop', description='d', location='l', is_verified=True
+        )
+
+    def tearDown(self):
+        # Write buffered views inside the test transaction so they are rolled back
+        view_counter.flush()
+
+    def create_job(self, comments):
+        job = JobVacancy.objects.create(
+            shop=self.shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        for _ in range(comments):
+            top = VacancyComment.objects.create(job=job, user=self.owner, text='question')
+            reply = VacancyComment.objects.create(job=job, user=self.owner, text='answer', parent=top)
+            VacancyComment.objects.create(job=job, user=self.owner, text='thanks', parent=reply)
+        return job
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response.json()
+
+    def test_full_list_query_count_is_independent_of_comments(self):
+        self.create_job(comments=1)
+        small, _ = self.count_queries('/api/jobs/?view=full')
+        for _ in range(5):
+            self.create_job(comments=10)
+        large, data = self.count_queries('/api/jobs/?view=full')
+        self.assertEqual(small, large)
+        self.assertEqual(large, 2)
+        self.assertEqual(len(data['results'][0]['comments']), 10)
+
+    def test_retrieve_builds_nested_tree(self):
+        job = self.create_job(comments=20)
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/jobs/{job.id}/')
+        comments = response.json()['comments']
+        self.assertEqual(len(comments), 20)
+        self.assertEqual(comments[0]['user'], 'owner')
+        self.assertEqual(comments[0]['replies'][0]['text'], 'answer')
+        self.assertEqual(comments[0]['replies'][0]['replies'][0]['text'], 'thanks')
+
+    def test_comment_list_query_count(self):
+        self.create_job(comments=5)
+        self.client.force_authenticate(self.owner)
+        queries, data = self.count_queries('/api/comments/')
+        self.assertEqual(queries, 2)
+        self.assertEqual(len(data), 15)
+
+
+@benchmarks.benchmark_settings()
+class ApiQueryBudgetTests(TestCase):
+    # Measured, not taken from ENDPOINTS, so raising a budget there shows up here
+    QUERY_COUNTS = {
+        'users-list': 1, 'users-detail': 1, 'users-me': 0, 'users-change-password': 2, 'users-update-profile': 2,
+        'shops-list': 1, 'shops-near': 1, 'shops-detail': 1, 'shops-my-shop': 0, 'shops-analytics': 3,
+        'shops-export-applicants': 1, 'shops-update': 3,
+        'jobs-list': 1, 'jobs-list-full': 2, 'jobs-search': 2, 'jobs-near': 2, 'jobs-detail': 2, 'jobs-create': 8,
+        'jobs-update': 4, 'jobs-apply': 9, 'jobs-comment': 4, 'jobs-bulk-reject-pending': 6,
+        'jobs-export-applicants-csv': 2,
+        'applications-list': 1, 'applications-list-full': 2, 'applications-list-owner': 1, 'applications-detail': 2,
+        'applications-update': 4, 'applications-delete': 5, 'applications-summary': 1, 'applications-my-cvs': 1,
+        'applications-bulk-update-status': 5,
+        'comments-list': 2, 'comments-update': 4, 'comments-delete': 5,
+        'cv-uploads-create': 2, 'cv-uploads-detail': 1, 'cv-uploads-chunk': 3, 'cv-uploads-finalize': 3,
+        'async-jobs-list': 1, 'async-jobs-search': 1, 'async-jobs-near': 1, 'async-jobs-detail': 2,
+        'async-jobs-comments': 2, 'async-shops-list': 1, 'async-shops-near': 1, 'async-shops-detail': 1,
+        'events-ticket': 1, 'events-poll': 1,
+    }
+
+    def setUp(self):
+        cache.clear()
+        staging = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, staging)
+        storages = {**settings.STORAGES, 'staging': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': staging}}}
+        staging_settings = self.settings(STORAGES=storages)
+        staging_settings.enable()
+        self.addCleanup(staging_settings.disable)
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def test_endpoints_make_the_expected_queries(self):
+        synthetic.generate(shops=3, jobs_per_shop=3, seekers=10, applications_per_seeker=3, comment_trees=2)
+        results = benchmarks.measure(repeat=1)
+        self.assertEqual(set(results), set(benchmarks.ENDPOINTS))
+        budgeted = {name for name, endpoint in benchmarks.ENDPOINTS.items() if endpoint[4] is not None}
+        self.assertEqual(set(self.QUERY_COUNTS), budgeted)
+        for name, result in results.items():
+            with self.subTest(endpoint=name):
+                self.assertLess(result['status'], 300)
+                if name in self.QUERY_COUNTS:
+                    self.assertEqual(result['queries'], self.QUERY_COUNTS[name])
+                    self.assertLessEqual(result['queries'], result['query_budget'])
+
+    def test_upload_targets_leave_nothing_behind(self):
+        synthetic.generate(shops=2, jobs_per_shop=2, seekers=4, applications_per_seeker=2, comment_trees=1)
+        benchmarks.measure(['cv-uploads-create', 'cv-uploads-chunk'], repeat=2)
+        self.assertFalse(CVUpload.objects.exists())
+        self.assertEqual(staging_storage().listdir('uploads'), ([], []))
+
+    def test_query_counts_do_not_grow_with_the_dataset(self):
+        synthetic.generate(shops=2, jobs_per_shop=2, seekers=4, applications_per_seeker=2, comment_trees=1)
+        small = benchmarks.measure(repeat=1)
+        synthetic.generate(shops=6, jobs_per_shop=4, seekers=20, applications_per_seeker=6, comment_trees=3, seed=1)
+        large = benchmarks.measure(repeat=1)
+        # Cascading deletes are not budgeted; they grow with the rows removed
+        budgeted = [name for name, endpoint in benchmarks.ENDPOINTS.items() if endpoint[4] is not None]
+        self.assertEqual(
+            {name: large[name]['queries'] for name in budgeted},
+            {name: small[name]['queries'] for name in budgeted},
+        )
+
+    def test_percentile(self):
+        self.assertEqual(benchmarks.percentile(list(range(1, 21)), 0.95), 19)
+        self.assertEqual(benchmarks.percentile(list(range(1, 11)), 0.95), 10)
+        self.assertEqual(benchmarks.percentile([4], 0.95), 4)
+
+    def test_compare_reports_regressions(self):
+        baseline = {'jobs-list': {'queries': 1, 'query_budget': 1, 'median_ms': 4.0, 'bytes': 1000}}
+        self.assertEqual(benchmarks.compare(baseline, baseline), [])
+        slower = {'jobs-list': {'queries': 2, 'query_budget': 1, 'median_ms': 9.0, 'bytes': 1200}}
+        self.assertEqual(len(benchmarks.compare(slower, baseline)), 4)
+
+
+@override_settings(JOBS_SHARED_CACHES=['default'])
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', password='pass')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_reads_are_served_from_the_cache(self):
+        self.client.get('/api/users/me/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.json()['username'], 'seeker')
+
+    def test_writes_do_not_save_a_cached_row(self):
+        self.client.get('/api/users/me/')
+        # Changed elsewhere, without the signals that drop the cached user
+        User.objects.filter(pk=self.user.pk).update(first_name='Changed', role='SHOP_OWNER')
+        response = self.client.patch('/api/users/update_profile/', {'mobile_number': '5550100'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.mobile_number, self.user.role), ('Changed', '5550100', 'SHOP_OWNER'))
+
+    def test_local_cache_is_not_used(self):
+        with override_settings(JOBS_SHARED_CACHES=None):
+            self.client.get('/api/users/me/')
+            with self.assertNumQueries(1):
+                self.client.get('/api/users/me/')
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+
+    def test_validators_require_a_shared_cache(self):
+        response = self.client.get('/api/shops/')
+        self.assertNotIn('ETag', response)
+
+    @override_settings(JOBS_SHARED_CACHES=['default'])
+    def test_changes_invalidate_the_etag(self):
+        etag = self.client.get('/api/shops/')['ETag']
+        self.assertEqual(self.client.get('/api/shops/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        shop = ShopProfile.objects.get()
+        shop.company_name = 'Renamed'
+        shop.save()
+        response = self.client.get('/api/shops/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['company_name'], 'Renamed')
+
+    @override_settings(JOBS_SHARED_CACHES=['default'])
+    def test_versions_move_again_on_commit(self):
+        key = cache_module.version_key('shops')
+        with self.captureOnCommitCallbacks(execute=True):
+            cache_module.bump(key)
+            during = cache.get(key)
+        self.assertGreater(cache.get(key), during)
+
+    @override_settings(JOBS_SHARED_CACHES=['default'])
+    def test_renaming_a_commenter_invalidates_comment_trees(self):
+        job = JobVacancy.objects.create(
+            shop=ShopProfile.objects.get(), title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        seeker = User.objects.create_user('seeker', password='pass')
+        VacancyComment.objects.create(job=job, user=seeker, text='Still open?')
+        etag = self.client.get(f'/api/jobs/{job.pk}/')['ETag']
+        seeker.username = 'renamed'
+        seeker.save()
+        response = self.client.get(f'/api/jobs/{job.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comments'][0]['user'], 'renamed')
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', password='pass')
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def test_stream_needs_asgi(self):
+        self.assertEqual(self.client.get('/api/events/stream/', headers=self.auth).status_code, 501)
+
+    async def test_ticket_opens_the_stream_once(self):
+        response = await self.async_client.post('/api/events/ticket/', headers=self.auth)
+        ticket = response.json()['ticket']
+        response = await self.async_client.get(f'/api/events/stream/?ticket={ticket}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await anext(aiter(response.streaming_content)), b'retry: 3000\n\n')
+        response = await self.async_client.get(f'/api/events/stream/?ticket={ticket}')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_access_token_is_not_accepted_in_the_url(self):
+        token = AccessToken.for_user(self.user)
+        response = await self.async_client.get(f'/api/events/stream/?token={token}')
+        self.assertEqual(response.status_code, 401)
+
+    def test_endpoints_need_a_valid_token(self):
+        other = User.objects.create_user('inactive', password='pass', is_active=False)
+        for headers in ({}, {'Authorization': 'Bearer not-a-token'}, {'Authorization': f'Bearer {AccessToken.for_user(other)}'}):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.client.post('/api/events/ticket/', headers=headers).status_code, 401)
+                self.assertEqual(self.client.get('/api/events/poll/?after=0', headers=headers).status_code, 401)
+
+    def test_poll_without_after_returns_the_last_id(self):
+        last_id = events.get_broker().last_id
+        response = self.client.get('/api/events/poll/', headers=self.auth)
+        self.assertEqual(response.json(), {'events': [], 'last_id': last_id, 'reset': False})
+
+    def test_poll_times_out_under_wsgi(self):
+        last_id = events.get_broker().last_id
+        started = time.monotonic()
+        response = self.client.get(f'/api/events/poll/?after={last_id}&timeout=0.2', headers=self.auth)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(response.json(), {'events': [], 'last_id': last_id, 'reset': False})
+        self.assertEqual(self.client.get('/api/events/poll/?after=0&timeout=soon', headers=self.auth).status_code, 400)
+
+    def test_poll_wakes_up_for_an_event(self):
+        broker = events.get_broker()
+        last_id = broker.last_id
+        publisher = threading.Timer(0.1, broker.publish, [{self.user.pk}, 'application.created', {'id': 1}])
+        publisher.start()
+        self.addCleanup(publisher.join)
+        started = time.monotonic()
+        response = self.client.get(f'/api/events/poll/?after={last_id}&timeout=10', headers=self.auth)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(response.json()['events'], [{'id': last_id + 1, 'type': 'application.created', 'data': {'id': 1}}])
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        self.shop = ShopProfile.objects.create(
+            user=owner, company_name='Corner Shop', description='d', location='l', latitude=40.0, longitude=-74.0
+        )
+        self.jobs = [
+            JobVacancy.objects.create(
+                shop=self.shop, title=title, description='d', skills_required='s',
+                experience_required='e', education_required='e'
+            )
+            for title in ('Cashier', 'Baker', 'Barista')
+        ]
+        seeker = User.objects.create_user('seeker', password='pass')
+        question = VacancyComment.objects.create(job=self.jobs[0], user=seeker, text='Is this still open?')
+        VacancyComment.objects.create(job=self.jobs[0], user=owner, text='Yes', parent=question)
+
+    def tearDown(self):
+        view_counter.flush()
+
+    async def test_job_list_pages_by_cursor(self):
+        titles, url = [], '/api/async/jobs/?page_size=2'
+        while url:
+            page = (await self.async_client.get(url)).json()
+            titles += [job['title'] for job in page['results']]
+            url = page['next']
+        self.assertEqual(titles, ['Barista', 'Baker', 'Cashier'])
+
+    async def test_job_list_search_and_near(self):
+        page = (await self.async_client.get('/api/async/jobs/?q=bake')).json()
+        self.assertEqual([job['title'] for job in page['results']], ['Baker'])
+        page = (await self.async_client.get('/api/async/jobs/?near=40.01,-74&page_size=2')).json()
+        self.assertEqual(len(page['results']), 2)
+        self.assertIn('offset=2', page['next'])
+        self.assertAlmostEqual(page['results'][0]['distance_km'], 1.11, places=2)
+
+    async def test_bad_parameters_are_rejected(self):
+        for query in ('page_size=0', 'cursor=nonsense', 'job_type=GIG', 'q=x&offset=-1', 'near=north'):
+            with self.subTest(query=query):
+                self.assertEqual((await self.async_client.get(f'/api/async/jobs/?{query}')).status_code, 400)
+
+    async def test_details_and_comments(self):
+        response = await self.async_client.get(f'/api/async/jobs/{self.jobs[0].pk}/comments/')
+        [question] = response.json()
+        self.assertEqual([reply['text'] for reply in question['replies']], ['Yes'])
+        response = await self.async_client.get(f'/api/async/jobs/{self.jobs[0].pk}/')
+        self.assertEqual(response.json()['title'], 'Cashier')
+        response = await self.async_client.get(f'/api/async/shops/{self.shop.pk}/')
+        self.assertEqual(response.json()['company_name'], 'Corner Shop')
+        for url in ('/api/async/jobs/0/', '/api/async/jobs/0/comments/', '/api/async/shops/0/'):
+            with self.subTest(url=url):
+                self.assertEqual((await self.async_client.get(url)).status_code, 404)
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l', is_verified=True)
+        self.job = JobVacancy.objects.create(
+            shop=shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        for n in range(3):
+            seeker = User.objects.create_user(f'seeker{n}', password='pass')
+            JobApplication.objects.create(job=self.job, applicant=seeker)
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def post(self, body):
+        return self.client.post('/api/applications/bulk_update_status/', body, format='json')
+
+    def test_filter_is_capped(self):
+        with mock.patch.object(transitions, 'MAX_BULK_IDS', 2):
+            response = self.post({'filter': {'job': self.job.pk}, 'status': 'REJECTED'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.exclude(status='PENDING').exists())
+
+    def test_filter_must_be_known_keys(self):
+        for selection in ({'jb': self.job.pk}, {'job': self.job.pk, 'jb': 1}, {'job': None}, {'status': [[1]]}, {'status': ['NOPE']}):
+            with self.subTest(filter=selection):
+                self.assertEqual(self.post({'filter': selection, 'status': 'REJECTED'}).status_code, 400)
+        self.assertFalse(JobApplication.objects.exclude(status='PENDING').exists())
+
+    def test_bools_are_not_ids(self):
+        self.assertEqual(self.post({'ids': [True], 'status': 'REJECTED'}).status_code, 400)
+        self.assertEqual(self.post({'filter': {'job': True}, 'status': 'REJECTED'}).status_code, 400)
+
+
+class StoredCVTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        staging = {**settings.STORAGES, 'staging': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': os.path.join(media, 'staging')}}}
+        media_settings = self.settings(MEDIA_ROOT=media, STORAGES=staging)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+        self.jobs = [
+            JobVacancy.objects.create(
+                shop=shop, title=title, description='d', skills_required='s',
+                experience_required='e', education_required='e'
+            )
+            for title in ('Cashier', 'Baker')
+        ]
+        self.storage = JobApplication._meta.get_field('cv').storage
+        self.client = APIClient()
+
+    def apply(self, username, filename, content, job=0):
+        seeker = User.objects.filter(username=username).first() or User.objects.create_user(username, password='pass')
+        name = self.storage.save(f'cvs/{filename}', ContentFile(content))
+        return JobApplication.objects.create(job=self.jobs[job], applicant=seeker, cv=name)
+
+    def test_duplicates_share_one_file_and_keep_their_names(self):
+        alice = self.apply('alice', 'alice_cv.pdf', b'same cv')
+        bob = self.apply('bob', 'bob_cv.pdf', b'same cv')
+        call_command('backfill_stored_cvs', stdout=io.StringIO())
+
+        stored = StoredCV.objects.get()
+        self.assertEqual((stored.ref_count, stored.file.name), (2, alice.cv.name))
+        self.assertTrue(self.storage.exists(alice.cv.name))
+        self.assertFalse(self.storage.exists(bob.cv.name))
+        bob.refresh_from_db()
+        self.assertEqual((bob.cv.name, bob.cv_filename), (alice.cv.name, 'bob_cv.pdf'))
+
+        self.client.force_authenticate(bob.applicant)
+        response = self.client.get('/api/applications/my_cvs/')
+        self.assertEqual([cv['filename'] for cv in response.json()], ['bob_cv.pdf'])
+
+    def test_reused_cv_keeps_the_seekers_name(self):
+        self.apply('alice', 'alice_cv.pdf', b'same cv')
+        bob = self.apply('bob', 'bob_cv.pdf', b'same cv')
+        call_command('backfill_stored_cvs', stdout=io.StringIO())
+
+        self.client.force_authenticate(bob.applicant)
+        response = self.client.post(
+            f'/api/jobs/{self.jobs[1].pk}/apply/',
+            {'meets_requirements': True, 'stored_cv': StoredCV.objects.get().pk},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(JobApplication.objects.get(job=self.jobs[1]).cv_filename, 'bob_cv.pdf')
+
+    def test_apply_stores_an_uploaded_cv_by_digest(self):
+        seeker = User.objects.create_user('carol', password='pass')
+        self.client.force_authenticate(seeker)
+        cv = SimpleUploadedFile('carol_cv.pdf', b'%PDF carol', content_type='application/pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/jobs/{self.jobs[0].pk}/apply/', {'meets_requirements': True, 'cv': cv})
+        self.assertEqual(response.status_code, 201)
+        application = JobApplication.objects.get(applicant=seeker)
+        self.assertEqual(application.cv_filename, 'carol_cv.pdf')
+        self.assertEqual(application.cv.name, application.stored_cv.file.name)
+        self.assertEqual(application.stored_cv.ref_count, 1)
+
+    def test_cv_cannot_be_replaced_by_an_update(self):
+        alice = self.apply('alice', 'alice_cv.pdf', b'same cv')
+        self.client.force_authenticate(alice.applicant)
+        replacement = SimpleUploadedFile('other.pdf', b'other', content_type='application/pdf')
+        response = self.client.patch(f'/api/applications/{alice.pk}/', {'cv': replacement, 'notes': 'Hi'}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        alice.refresh_from_db()
+        self.assertEqual((alice.notes, alice.cv.name), ('Hi', 'cvs/alice_cv.pdf'))
+
+    def test_dry_run_changes_nothing(self):
+        self.apply('alice', 'alice_cv.pdf', b'same cv')
+        self.apply('bob', 'bob_cv.pdf', b'same cv')
+        out = io.StringIO()
+        call_command('backfill_stored_cvs', '--dry-run', stdout=out)
+        self.assertIn('Would link 2 CVs and free 7 bytes', out.getvalue())
+        self.assertFalse(StoredCV.objects.exists())
+
+
+class CVUploadTests(TestCase):
+    content = b'%PDF-1.4 carol'
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        staging = {**settings.STORAGES, 'staging': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': os.path.join(media, 'staging')}}}
+        media_settings = self.settings(MEDIA_ROOT=media, STORAGES=staging)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+        self.job = JobVacancy.objects.create(
+            shop=shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        self.seeker = User.objects.create_user('carol', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def create(self, size=None, filename='carol_cv.pdf'):
+        response = self.client.post('/api/cv_uploads/', {
+            'filename': filename, 'content_type': 'application/pdf', 'size': size or len(self.content),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, upload_id, offset, data):
+        return self.client.put(
+            f'/api/cv_uploads/{upload_id}/chunk/?offset={offset}', data, content_type='application/octet-stream'
+        )
+
+    def test_chunks_are_appended_and_finalized(self):
+        upload_id = self.create()
+        self.assertEqual(self.put(upload_id, 0, self.content[:6]).json()['received'], 6)
+        self.assertEqual(self.put(upload_id, 6, self.content[6:]).json()['received'], len(self.content))
+        response = self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        self.assertEqual(response.json()['status'], 'COMPLETE')
+        upload = CVUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.digest, hashlib.sha256(self.content).hexdigest())
+
+    def test_wrong_offset_conflicts_and_reports_received(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, self.content[:6])
+        response = self.put(upload_id, 3, self.content[3:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received'], 6)
+
+    def test_interrupted_upload_resumes_from_received(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, self.content[:6])
+        received = self.client.get(f'/api/cv_uploads/{upload_id}/').json()['received']
+        self.assertEqual(received, 6)
+        self.put(upload_id, received, self.content[received:])
+        self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        with staging_storage().open(CVUpload.objects.get(pk=upload_id).staged_name, 'rb') as staged:
+            self.assertEqual(staged.read(), self.content)
+
+    def test_chunk_beyond_declared_size_is_refused(self):
+        upload_id = self.create(size=4)
+        self.assertEqual(self.put(upload_id, 0, self.content).status_code, 413)
+        self.assertEqual(CVUpload.objects.get(pk=upload_id).received, 0)
+
+    def test_finalize_refuses_incomplete_uploads(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, self.content[:6])
+        response = self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        self.assertEqual((response.status_code, response.json()['received']), (400, 6))
+        self.assertEqual(CVUpload.objects.get(pk=upload_id).status, 'UPLOADING')
+
+    def test_finalize_discards_content_of_the_wrong_type(self):
+        upload_id = self.create(size=9)
+        self.put(upload_id, 0, b'MZnot pdf')
+        staged_name = CVUpload.objects.get(pk=upload_id).staged_name
+        response = self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CVUpload.objects.filter(pk=upload_id).exists())
+        self.assertFalse(staging_storage().exists(staged_name))
+
+    def test_apply_with_a_finalized_upload(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, self.content)
+        self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/jobs/{self.job.pk}/apply/', {'meets_requirements': True, 'cv_upload': upload_id}
+            )
+        self.assertEqual(response.status_code, 201)
+        application = JobApplication.objects.get(applicant=self.seeker)
+        self.assertEqual(application.cv_filename, 'carol_cv.pdf')
+        self.assertEqual(application.stored_cv.digest, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(CVUpload.objects.get(pk=upload_id).status, 'USED')
+
+    def test_apply_refuses_unfinished_or_used_uploads(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, self.content)
+        url = f'/api/jobs/{self.job.pk}/apply/'
+        response = self.client.post(url, {'meets_requirements': True, 'cv_upload': upload_id})
+        self.assertEqual(response.status_code, 400)
+        self.client.post(f'/api/cv_uploads/{upload_id}/finalize/')
+        CVUpload.objects.filter(pk=upload_id).update(status='USED')
+        response = self.client.post(url, {'meets_requirements': True, 'cv_upload': upload_id})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.exists())
+
+
+class MediaServeTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for folder in ('cvs', 'logos'):
+            os.mkdir(os.path.join(self.root, folder))
+            with open(os.path.join(self.root, folder, 'file.txt'), 'wb') as handle:
+                handle.write(b'0123456789')
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        return media.serve(self.factory.get(f'/media/{path}', headers=headers), path, document_root=self.root)
+
+    def test_byte_range(self):
+        self.assertEqual(media._byte_range('bytes=2-5', 10), (2, 5))
+        self.assertEqual(media._byte_range('bytes=7-', 10), (7, 9))
+        self.assertEqual(media._byte_range('bytes=5-99', 10), (5, 9))
+        self.assertEqual(media._byte_range('bytes=-3', 10), (7, 9))
+        self.assertEqual(media._byte_range('bytes=-30', 10), (0, 9))
+        self.assertIs(media._byte_range('bytes=10-', 10), False)
+        self.assertIs(media._byte_range('bytes=6-2', 10), False)
+        self.assertIs(media._byte_range('bytes=-0', 10), False)
+        self.assertIsNone(media._byte_range('bytes=0-1,4-5', 10))
+        self.assertIsNone(media._byte_range('bytes=-', 10))
+        self.assertIsNone(media._byte_range('items=0-1', 10))
+
+    def test_partial_content(self):
+        response = self.get('logos/file.txt', Range='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+
+    def test_unsatisfiable_range(self):
+        response = self.get('logos/file.txt', Range='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.get('logos/file.txt', Range='bytes=2-5', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_cvs_are_not_cached(self):
+        self.assertTrue(self.get('logos/file.txt')['Cache-Control'].startswith('public'))
+        self.assertEqual(self.get('cvs/file.txt')['Cache-Control'], 'private, no-store')
+        self.assertEqual(self.get('logos/../cvs/file.txt')['Cache-Control'], 'private, no-store')
+
+
+class ViewCounterTests(SimpleTestCase):
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0.01)
+    def test_timer_flushes_without_further_views(self):
+        counter = ViewCounter()
+        flushed = threading.Event()
+        with mock.patch.object(counter, 'flush', side_effect=flushed.set):
+            counter._record(1, 1)
+            self.assertTrue(flushed.wait(5))
+
+
+class StatsRollupTests(TestCase):
+    def setUp(self):
+        self.shops = []
+        for n in range(2):
+            owner = User.objects.create_user(f'owner{n}', password='pass', role='SHOP_OWNER')
+            self.shops.append(ShopProfile.objects.create(user=owner, company_name=f'Shop {n}', description='d', location='l'))
+        self.seekers = [User.objects.create_user(f'seeker{n}', password='pass') for n in range(4)]
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def create_job(self, shop):
+        return JobVacancy.objects.create(
+            shop=shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+
+    def rollups(self):
+        return (
+            list(ShopStats.objects.order_by('pk').values()),
+            list(JobStats.objects.order_by('pk').values()),
+        )
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        jobs = [self.create_job(shop) for shop in self.shops for _ in range(2)]
+        for job in jobs:
+            for seeker in self.seekers:
+                JobApplication.objects.create(job=job, applicant=seeker)
+
+        application = JobApplication.objects.filter(job=jobs[0]).first()
+        application.status = 'ACCEPTED'
+        application.save()
+        JobApplication.objects.filter(job=jobs[1]).first().delete()
+        # The recount task runs when the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            transitions.apply_status(JobApplication.objects.filter(job__in=jobs[:3], status='PENDING'), 'SHORTLISTED')
+        with self.captureOnCommitCallbacks(execute=True):
+            transitions.apply_status(JobApplication.objects.filter(job=jobs[3]), 'REJECTED', owner_note='Filled')
+        # A retried recount changes nothing
+        stats.recount([job.pk for job in jobs])
+
+        for job in jobs:
+            view_counter.increment(job.pk, 3)
+        view_counter.flush()
+        # Loaded before more views were flushed, then deleted with its applications
+        stale = JobVacancy.objects.get(pk=jobs[0].pk)
+        view_counter.increment(jobs[0].pk, 5)
+        view_counter.flush()
+        stale.delete()
+        # Views still buffered for a deleted job are dropped
+        view_counter.increment(jobs[2].pk, 2)
+        jobs[2].delete()
+        view_counter.flush()
+        self.shops[1].delete()
+
+        incremental = self.rollups()
+        stats.rebuild()
+        self.assertEqual(incremental, self.rollups())
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        registry = {**queue._registry, 'test-record': self.record, 'test-fail': self.fail_task}
+        patcher = mock.patch.object(queue, '_registry', registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, value):
+        self.calls.append(value)
+
+    def fail_task(self):
+        raise RuntimeError('boom')
+
+    def test_tasks_run_once(self):
+        task = queue.enqueue('test-record', {'value': 1})
+        self.assertEqual([t.pk for t in queue.claim(10)], [task.pk])
+        self.assertEqual(queue.claim(10), [])
+        self.assertEqual(queue.run_task(Task.objects.get(pk=task.pk)), 'DONE')
+        self.assertEqual(self.calls, [1])
+
+    def test_expired_lease_is_claimed_again(self):
+        task = queue.enqueue('test-record', {'value': 1})
+        queue.claim(10)
+        # The worker holding it died
+        Task.objects.filter(pk=task.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        [reclaimed] = queue.claim(10)
+        self.assertEqual((reclaimed.pk, reclaimed.attempts, reclaimed.status), (task.pk, 2, 'RUNNING'))
+
+    def test_failures_are_retried_with_backoff(self):
+        task = queue.enqueue('test-fail', max_attempts=3)
+        [claimed] = queue.claim(10)
+        before = timezone.now()
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertEqual(queue.run_task(claimed), 'QUEUED')
+        task.refresh_from_db()
+        self.assertEqual(task.last_error, 'RuntimeError: boom')
+        self.assertIsNone(task.locked_until)
+        self.assertGreaterEqual(task.run_at, before + timedelta(seconds=queue.BACKOFF_BASE))
+        # Not due again until the backoff has passed
+        self.assertEqual(queue.claim(10), [])
+        self.assertEqual([queue.backoff(n) for n in (1, 2, 3, 20)], [10, 20, 40, queue.BACKOFF_MAX])
+
+    def test_last_attempt_fails_the_task(self):
+        task = queue.enqueue('test-fail', max_attempts=2)
+        for expected in ('QUEUED', 'FAILED'):
+            Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+            [claimed] = queue.claim(10)
+            with self.assertLogs('jobs.queue', 'ERROR'):
+                self.assertEqual(queue.run_task(claimed), expected)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('FAILED', 2))
+        self.assertIsNotNone(task.finished_at)
+        self.assertEqual(queue.claim(10), [])
+
+    def test_bulk_transitions_queue_a_recount(self):
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+        job = JobVacancy.objects.create(
+            shop=shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        JobApplication.objects.create(job=job, applicant=User.objects.create_user('seeker', password='pass'))
+        transitions.apply_status(JobApplication.objects.all(), 'REJECTED')
+        task = Task.objects.get(name='recount_stats')
+        self.assertEqual(task.payload, {'job_ids': [job.pk]})
+        [claimed] = queue.claim(10)
+        self.assertEqual(queue.run_task(claimed), 'DONE')
+        # Running it again after a lost lease gives the same counts
+        queue.run_task(claimed)
+        stats_row = JobStats.objects.get(pk=job.pk)
+        self.assertEqual((stats_row.pending, stats_row.rejected), (0, 1))
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        self.shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+
+    def vacancy(self, title, description='Friendly team.', skills='Punctuality'):
+        return JobVacancy.objects.create(
+            shop=self.shop, title=title, description=description, skills_required=skills,
+            experience_required='e', education_required='e'
+        )
+
+    def search(self, text):
+        return [job.title for job in search.search_vacancies(JobVacancy.objects.all(), text)]
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.vacancy('Cashier', description='Help our barista at the till.')
+        self.vacancy('Barista')
+        self.vacancy('Cook', skills='Barista experience')
+        self.assertEqual(self.search('barista'), ['Barista', 'Cook', 'Cashier'])
+
+    def test_partial_words_match(self):
+        self.vacancy('Barista')
+        self.vacancy('Cashier')
+        self.assertEqual(self.search('bari'), ['Barista'])
+        # Quotes and operators are not parsed as FTS syntax
+        self.assertEqual(self.search('bari"*('), ['Barista'])
+        self.assertEqual(self.search('!?'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        job = self.vacancy('Barista')
+        job.title = 'Baker'
+        job.save()
+        self.assertEqual(self.search('barista'), [])
+        self.assertEqual(self.search('baker'), ['Baker'])
+        job.delete()
+        self.assertEqual(self.search('baker'), [])
+
+    def test_rank_comes_from_one_join(self):
+        self.vacancy('Barista')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/?q=barista')
+        self.assertEqual([job['title'] for job in response.json()['results']], ['Barista'])
+        sql = next(query['sql'] for query in queries.captured_queries if 'bm25' in query['sql'])
+        self.assertEqual(sql.count(search.FTS_TABLE + ' MATCH'), 1)
+
+
+class NearbyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Roughly 1, 5.5 and 22 km north of (40, -74)
+        self.shops = {}
+        for name, lat, lng in (('near', 40.01, -74.0), ('middle', 40.05, -74.0), ('far', 40.2, -74.0), ('nowhere', None, None)):
+            owner = User.objects.create_user(name, password='pass', role='SHOP_OWNER')
+            shop = ShopProfile.objects.create(
+                user=owner, company_name=name, description='d', location='l', latitude=lat, longitude=lng
+            )
+            JobVacancy.objects.create(
+                shop=shop, title=f'{name} job', description='d', skills_required='s',
+                experience_required='e', education_required='e'
+            )
+            self.shops[name] = shop
+
+    def test_shops_within_the_radius_nearest_first(self):
+        response = self.client.get('/api/shops/?near=40,-74')
+        self.assertEqual([shop['company_name'] for shop in response.json()], ['near', 'middle'])
+        self.assertAlmostEqual(response.json()[0]['distance_km'], 1.11, places=2)
+        response = self.client.get('/api/shops/?near=40,-74&radius_km=30')
+        self.assertEqual([shop['company_name'] for shop in response.json()], ['near', 'middle', 'far'])
+
+    def test_radius_is_a_cutoff(self):
+        response = self.client.get('/api/jobs/?near=40,-74&radius_km=1')
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.get('/api/jobs/?near=40,-74&radius_km=1.2')
+        self.assertEqual([job['title'] for job in response.json()['results']], ['near job'])
+
+    def test_search_across_the_antimeridian(self):
+        east = self.shops['far']
+        east.latitude, east.longitude = 0.0, 179.99
+        east.save()
+        response = self.client.get('/api/shops/?near=0,-179.99')
+        self.assertEqual([shop['company_name'] for shop in response.json()], ['far'])
+        self.assertAlmostEqual(response.json()[0]['distance_km'], 2.22, places=2)
+
+    def test_bad_points_and_radii_are_rejected(self):
+        for query in ('near=40', 'near=north,south', 'near=91,0', 'near=40,-74&radius_km=0', 'near=40,-74&radius_km=501'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/jobs/?{query}').status_code, 400)
+
+
+class VacancyFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shops = []
+        for name in ('first', 'second'):
+            owner = User.objects.create_user(name, password='pass', role='SHOP_OWNER')
+            self.shops.append(ShopProfile.objects.create(user=owner, company_name=name, description='d', location='l'))
+        now = timezone.now()
+        for title, shop, job_type, salary, is_active, age in (
+            ('Barista', 0, 'FULL_TIME', '$18 / hr', True, 1),
+            ('Cashier', 0, 'PART_TIME', '', True, 10),
+            ('Cook', 1, 'PART_TIME', None, True, 20),
+            ('Closed', 1, 'FULL_TIME', '$20 / hr', False, 5),
+        ):
+            job = JobVacancy.objects.create(
+                shop=self.shops[shop], title=title, job_type=job_type, salary_range=salary, is_active=is_active,
+                description='d', skills_required='s', experience_required='e', education_required='e'
+            )
+            JobVacancy.objects.filter(pk=job.pk).update(created_at=now - timedelta(days=age))
+
+    def titles(self, query):
+        response = self.client.get(f'/api/jobs/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [job['title'] for job in response.json()['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.titles(''), ['Barista', 'Cashier', 'Cook'])
+        self.assertEqual(self.titles('is_active=false'), ['Closed'])
+        self.assertEqual(self.titles('is_active=all'), ['Barista', 'Closed', 'Cashier', 'Cook'])
+        self.assertEqual(self.titles('job_type=PART_TIME'), ['Cashier', 'Cook'])
+        self.assertEqual(self.titles('job_type=FULL_TIME,PART_TIME&is_active=all'), ['Barista', 'Closed', 'Cashier', 'Cook'])
+        self.assertEqual(self.titles(f'shop={self.shops[1].pk}'), ['Cook'])
+        self.assertEqual(self.titles('has_salary=true'), ['Barista'])
+        self.assertEqual(self.titles('has_salary=false'), ['Cashier', 'Cook'])
+        since = (timezone.now() - timedelta(days=15)).date().isoformat()
+        self.assertEqual(self.titles(f'created_after={since}'), ['Barista', 'Cashier'])
+
+    def test_ordering(self):
+        self.assertEqual(self.titles('ordering=created_at'), ['Cook', 'Cashier', 'Barista'])
+        self.assertEqual(self.titles('ordering=-created_at&job_type=PART_TIME'), ['Cashier', 'Cook'])
+
+    def test_bad_values_are_rejected(self):
+        for query in (
+            'is_active=maybe', 'job_type=GIG', 'shop=first', 'has_salary=some',
+            'created_after=last-week', 'ordering=title',
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/jobs/?{query}').status_code, 400)
+
+
+class ApplicantExportTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=self.owner, company_name='Corner Shop', description='d', location='l', is_verified=True)
+        self.jobs = [
+            JobVacancy.objects.create(
+                shop=shop, title=title, description='d', skills_required='s',
+                experience_required='e', education_required='e'
+            )
+            for title in ('Cashier', 'Baker')
+        ]
+        for name, job, status_code in (('alice', 0, 'PENDING'), ('bob', 0, 'REJECTED'), ('carol', 1, 'PENDING')):
+            seeker = User.objects.create_user(name, email=f'{name}@example.com', password='pass')
+            JobApplication.objects.create(
+                job=self.jobs[job], applicant=seeker, status=status_code, meets_requirements=True, notes=f'Hi, {name}'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def download(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_job_csv(self):
+        response, content = self.download(f'/api/jobs/{self.jobs[0].pk}/export_applicants_csv/')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="applicants_job_{self.jobs[0].pk}.csv"')
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0], [header for header, _ in exports.APPLICANT_COLUMNS])
+        self.assertEqual([(row[0], row[3], row[5], row[6]) for row in rows[1:]], [
+            ('alice', 'PENDING', 'Yes', 'Hi, alice'),
+            ('bob', 'REJECTED', 'Yes', 'Hi, bob'),
+        ])
+
+    def test_job_csv_gzip(self):
+        url = f'/api/jobs/{self.jobs[0].pk}/export_applicants_csv/'
+        response, content = self.download(f'{url}?compress=gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(content), self.download(url)[1])
+
+    def test_job_csv_is_for_its_owner_only(self):
+        other = User.objects.create_user('other', password='pass', role='SHOP_OWNER')
+        ShopProfile.objects.create(user=other, company_name='Other', description='d', location='l', is_verified=True)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.jobs[0].pk}/export_applicants_csv/').status_code, 403)
+
+    def test_shop_xlsx(self):
+        from openpyxl import load_workbook
+
+        response, content = self.download('/api/shops/export_applicants/?file_format=xlsx')
+        self.assertEqual(response['Content-Type'], exports.CONTENT_TYPES['xlsx'])
+        rows = list(load_workbook(io.BytesIO(content), read_only=True)['Applicants'].values)
+        self.assertEqual(rows[0], tuple(header for header, _ in exports.SHOP_APPLICANT_COLUMNS))
+        self.assertEqual([(row[1], row[2], row[5]) for row in rows[1:]], [
+            ('Cashier', 'alice', 'PENDING'), ('Cashier', 'bob', 'REJECTED'), ('Baker', 'carol', 'PENDING'),
+        ])
+        # Times are written as naive UTC
+        applied_at = JobApplication.objects.get(applicant__username='alice').applied_at
+        utc = applied_at.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        self.assertAlmostEqual(rows[1][6], utc, delta=timedelta(milliseconds=1))
+
+    def test_shop_export_filters_and_formats(self):
+        _, content = self.download('/api/shops/export_applicants/?status=PENDING')
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual([(row[1], row[2]) for row in rows[1:]], [('Cashier', 'alice'), ('Baker', 'carol')])
+
+        _, content = self.download('/api/shops/export_applicants/?file_format=ndjson&status=REJECTED')
+        [line] = content.decode().splitlines()
+        self.assertEqual(json.loads(line)['name'], 'bob')
+
+        self.assertEqual(self.client.get('/api/shops/export_applicants/?file_format=pdf').status_code, 400)
+        self.assertEqual(self.client.get('/api/shops/export_applicants/?status=HIRED').status_code, 400)
+        self.assertEqual(self.client.get('/api/shops/export_applicants/?applied_after=soon').status_code, 400)
+
+
+class ShopAnalyticsTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', password='pass', role='SHOP_OWNER')
+        shop = ShopProfile.objects.create(user=owner, company_name='Corner Shop', description='d', location='l')
+        job = JobVacancy.objects.create(
+            shop=shop, title='Cashier', description='d', skills_required='s',
+            experience_required='e', education_required='e'
+        )
+        application = JobApplication.objects.create(job=job, applicant=User.objects.create_user('seeker', password='pass'))
+        JobApplication.objects.filter(pk=application.pk).update(applied_at=timezone.now() - timedelta(days=10))
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def test_days_limits_the_timeline(self):
+        response = self.client.get('/api/shops/analytics/?days=30')
+        self.assertEqual([point['count'] for point in response.json()['applications_over_time']], [1])
+        response = self.client.get('/api/shops/analytics/?days=5')
+        self.assertEqual(response.json()['applications_over_time'], [])
+        self.assertEqual(self.client.get('/api/shops/analytics/?days=365').status_code, 200)
+
+    def test_days_must_be_between_1_and_365(self):
+        for days in ('0', '-3', '366', '99999999999', '7.5', 'week', '²'):
+            with self.subTest(days=days):
+                self.assertEqual(self.client.get(f'/api/shops/analytics/?days={days}').status_code, 400)
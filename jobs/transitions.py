@@ -0,0 +1,59 @@
+"""
+Bulk application status changes.
+
+The selected rows are locked and read (the ``RETURNING`` half: their
+previous status) and then changed with a single ``UPDATE`` in the same
+transaction, so concurrent edits cannot slip in between the read and the
+write. A task queued in that transaction recounts the analytics rollups
+of the affected jobs, and change events are published once it commits.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .models import JobApplication
+from .queue import enqueue
+
+# Largest number of ids accepted by one bulk request
+MAX_BULK_IDS = 1000
+
+
+def apply_status(queryset, new_status, owner_note=None, limit=None):
+    """
+    Move every application in ``queryset`` to ``new_status`` (and set
+    ``owner_note`` unless it is None). Returns ``{id: (outcome, previous
+    status)}`` where outcome is ``'updated'`` or ``'unchanged'``. Raises
+    ``ValueError``, changing nothing, if more than ``limit`` match.
+    """
+    with transaction.atomic():
+        rows = queryset.select_for_update(of=('self',)).order_by('id').values_list(
+            'id', 'job_id', 'status', 'owner_note', 'applicant_id', 'job__shop__user_id'
+        )
+        rows = list(rows if limit is None else rows[:limit + 1])
+        if limit is not None and len(rows) > limit:
+            raise ValueError(f'At most {limit} applications can be updated at once.')
+        changed = [
+            row for row in rows
+            if row[2] != new_status or (owner_note is not None and row[3] != owner_note)
+        ]
+        if changed:
+            fields = {'status': new_status, 'updated_at': timezone.now()}
+            if owner_note is not None:
+                fields['owner_note'] = owner_note
+            JobApplication.objects.filter(pk__in=[row[0] for row in changed]).update(**fields)
+
+            # Queryset updates bypass signals. The rollups are recounted
+            # rather than adjusted, so a retried task cannot count twice
+            job_ids = sorted({job_id for _, job_id, status, *_ in changed if status != new_status})
+            if job_ids:
+                enqueue('recount_stats', {'job_ids': job_ids})
+
+            for pk, job_id, status, _, applicant_id, owner_id in changed:
+                if status != new_status:
+                    events.application_changed(pk, job_id, new_status, status, applicant_id, owner_id)
+
+    changed_ids = {row[0] for row in changed}
+    return {
+        pk: ('updated' if pk in changed_ids else 'unchanged', status)
+        for pk, _, status, *_ in rows
+    }
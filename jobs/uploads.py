@@ -0,0 +1,99 @@
+"""
+Resumable, chunked CV uploads.
+
+A client creates an upload with the file's name, type and size, then PUTs
+the bytes in chunks at increasing offsets. Each chunk is appended to a
+staging file straight from the request stream, so an interrupted upload
+resumes from the last acknowledged offset instead of from zero. Once
+finalized (which records the content digest), the upload id can be passed
+to ``apply`` in place of a file.
+"""
+import os
+
+from django.conf import settings
+
+from . import cvstore
+from .tasks import staging_storage
+
+CV_EXTENSIONS = {
+    '.pdf': ('application/pdf',),
+    '.doc': ('application/msword',),
+    '.docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document',),
+}
+# Leading bytes of each accepted format
+CV_SIGNATURES = {
+    '.pdf': (b'%PDF-',),
+    '.doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    '.docx': (b'PK\x03\x04',),
+}
+READ_SIZE = 64 * 1024
+
+
+def max_size():
+    return getattr(settings, 'CV_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def max_chunk_size():
+    return getattr(settings, 'CV_UPLOAD_MAX_CHUNK_SIZE', 2 * 1024 * 1024)
+
+
+def validate_declaration(filename, content_type, size):
+    """Return an error message if the declared file may not be uploaded, else None."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in CV_EXTENSIONS:
+        return f'CV must be one of: {", ".join(sorted(CV_EXTENSIONS))}.'
+    if content_type not in CV_EXTENSIONS[extension]:
+        return f'content_type does not match a {extension} file.'
+    if not isinstance(size, int) or size <= 0:
+        return 'size must be a positive integer.'
+    if size > max_size():
+        return f'CV must not be larger than {max_size()} bytes.'
+    return None
+
+
+def create_staging_file(upload):
+    staging = staging_storage()
+    path = staging.path(upload.staged_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+
+
+def write_chunk(upload, offset, stream):
+    """
+    Write the request body to the staging file at ``offset`` and return the
+    number of bytes written, or ``None`` if it would exceed the declared size
+    or the chunk size limit.
+    """
+    limit = min(max_chunk_size(), upload.size - offset)
+    written = 0
+    with open(staging_storage().path(upload.staged_name), 'r+b') as staged:
+        staged.seek(offset)
+        while True:
+            data = stream.read(READ_SIZE)
+            if not data:
+                break
+            written += len(data)
+            if written > limit:
+                staged.truncate(offset)
+                return None
+            staged.write(data)
+        # Drop anything left over from an earlier, interrupted attempt
+        staged.truncate(offset + written)
+    return written
+
+
+def matches_signature(upload):
+    extension = os.path.splitext(upload.filename)[1].lower()
+    signatures = CV_SIGNATURES[extension]
+    with staging_storage().open(upload.staged_name, 'rb') as staged:
+        head = staged.read(max(len(signature) for signature in signatures))
+    return head.startswith(signatures)
+
+
+def content_digest(upload):
+    with staging_storage().open(upload.staged_name, 'rb') as staged:
+        return cvstore.sha256_of(iter(lambda: staged.read(READ_SIZE), b''))
+
+
+def discard(upload):
+    staging_storage().delete(upload.staged_name)
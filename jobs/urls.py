@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, ShopProfileViewSet, JobVacancyViewSet, JobApplicationViewSet, VacancyCommentViewSet
+from .views import UserViewSet, ShopProfileViewSet, JobVacancyViewSet, JobApplicationViewSet, VacancyCommentViewSet, CVUploadViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -9,9 +10,20 @@ router.register(r'shops', ShopProfileViewSet)
 router.register(r'jobs', JobVacancyViewSet)
 router.register(r'applications', JobApplicationViewSet)
 router.register(r'comments', VacancyCommentViewSet)
+router.register(r'cv_uploads', CVUploadViewSet, basename='cvupload')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # Async-native read endpoints for ASGI deployments
+    path('async/jobs/', async_views.job_list, name='async-job-list'),
+    path('async/jobs/<int:pk>/', async_views.job_detail, name='async-job-detail'),
+    path('async/jobs/<int:pk>/comments/', async_views.job_comments, name='async-job-comments'),
+    path('async/shops/', async_views.shop_list, name='async-shop-list'),
+    path('async/shops/<int:pk>/', async_views.shop_detail, name='async-shop-detail'),
+    # Application and comment events: SSE, with long-polling as a fallback
+    path('events/ticket/', async_views.event_ticket, name='event-ticket'),
+    path('events/stream/', async_views.event_stream, name='event-stream'),
+    path('events/poll/', async_views.event_poll, name='event-poll'),
 ]
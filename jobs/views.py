@@ -1,17 +1,54 @@
 from rest_framework import viewsets, permissions, status, mixins
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.db.models import Count, Q, Sum
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from datetime import timedelta
+from functools import partial
+import hashlib
+import io
+import uuid
 from django.contrib.auth.password_validation import validate_password
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.core.exceptions import ValidationError as DjangoValidationError
-import csv
-from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment
+from .models import User, ShopProfile, JobVacancy, JobApplication, VacancyComment, JobStats, CVUpload
 from .serializers import (
-    UserSerializer, ShopProfileSerializer, JobVacancySerializer, 
-    JobApplicationSerializer, VacancyCommentSerializer
+    UserSerializer, ShopProfileSerializer, JobVacancySerializer, JobVacancyCardSerializer,
+    JobApplicationSerializer, JobApplicationCompactSerializer, VacancyCommentSerializer, CVUploadSerializer,
+    StoredCVSerializer
 )
+from .pagination import ApplicationCursorPagination, JobCursorPagination, RankedResultsPagination
+from .counters import view_counter
+from .cache import CachedReadMixin
+from .filters import filter_vacancies, parse_moment, vacancy_ordering
+from . import cvstore, exports, geo, search, stats, tasks, transitions, uploads
+
+ANALYTICS_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+def filter_near(queryset, params, prefix=''):
+    """Apply the ?near=lat,lng&radius_km= filter, ordering results by distance."""
+    try:
+        lat, lng = geo.parse_point(params['near'])
+        radius_km = float(params.get('radius_km', geo.DEFAULT_RADIUS_KM))
+    except ValueError:
+        raise ParseError('near must be "lat,lng" and radius_km a number.')
+    if not 0 < radius_km <= geo.MAX_RADIUS_KM:
+        raise ParseError(f'radius_km must be between 0 and {geo.MAX_RADIUS_KM:g}.')
+    return geo.within_radius(queryset, lat, lng, radius_km, prefix)
+
+
+def _is_id(value):
+    # JSON true and false arrive as bools, which are ints too
+    return isinstance(value, int) and not isinstance(value, bool)
 
 class IsShopOwner(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -68,13 +105,27 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
-class ShopProfileViewSet(viewsets.ModelViewSet):
-    queryset = ShopProfile.objects.all()
+class ShopProfileViewSet(CachedReadMixin, viewsets.ModelViewSet):
+    queryset = ShopProfile.objects.select_related('user')
     serializer_class = ShopProfileSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.request.query_params.get('near'):
+            queryset = filter_near(queryset, self.request.query_params)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_read(request, [('shops',)], partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_read(request, [('shop', kwargs['pk'])], partial(super().retrieve, request, *args, **kwargs))
+
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy', 'analytics']:
             return [IsShopOwner()]
+        if self.action == 'export_applicants':
+            return [IsVerifiedShopOwner()]
         return [permissions.AllowAny()]
 
     def perform_create(self, serializer):
@@ -92,39 +143,139 @@ class ShopProfileViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsShopOwner])
     def analytics(self, request):
         shop = request.user.shop_profile
-        
-        # Aggregate stats
-        total_jobs = JobVacancy.objects.filter(shop=shop).count()
-        total_views = JobVacancy.objects.filter(shop=shop).aggregate(Sum('views'))['views__sum'] or 0
-        total_applications = JobApplication.objects.filter(job__shop=shop).count()
-        
-        # Application breakdown
-        accepted = JobApplication.objects.filter(job__shop=shop, status='ACCEPTED').count()
-        rejected = JobApplication.objects.filter(job__shop=shop, status='REJECTED').count()
-        pending = JobApplication.objects.filter(job__shop=shop, status='PENDING').count()
-        
-        # Job performance (views per job)
-        jobs_performance = JobVacancy.objects.filter(shop=shop).values('title', 'views')
-        
+
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in ANALYTICS_BUCKETS:
+            return Response({'detail': 'bucket must be one of: day, week, month.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = None
+        if days is None or not 1 <= days <= 365:
+            return Response({'detail': 'days must be a whole number from 1 to 365.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Make this worker's buffered views visible before reading totals
+        view_counter.flush()
+
+        # Totals come from the incrementally maintained rollup tables
+        shop_stats = stats.get_shop_stats(shop)
+        jobs_performance = list(
+            JobStats.objects.filter(shop=shop)
+            .values(
+                'views', *stats.STATUS_FIELDS.values(),
+                id=F('job_id'), title=F('job__title'), applications_count=F('applications'),
+            )
+            .order_by('-job_id')
+        )
+
+        # Applications over time, bucketed by day, week or month
+        applications_over_time = (
+            JobApplication.objects.filter(job__shop=shop, applied_at__gte=timezone.now() - timedelta(days=days))
+            .annotate(period=ANALYTICS_BUCKETS[bucket]('applied_at'))
+            .values('period')
+            .annotate(count=Count('id'))
+            .order_by('period')
+        )
+
         return Response({
             'shop_verified': shop.is_verified,
             'kpis': {
-                'total_jobs': total_jobs,
-                'total_views': total_views,
-                'total_applications': total_applications,
+                'total_jobs': shop_stats.jobs,
+                'total_views': shop_stats.views,
+                'total_applications': shop_stats.applications,
             },
             'applications_status': [
-                {'name': 'Pending', 'value': pending},
-                {'name': 'Accepted', 'value': accepted},
-                {'name': 'Rejected', 'value': rejected},
+                {'name': label, 'value': getattr(shop_stats, stats.STATUS_FIELDS[code])}
+                for code, label in JobApplication.STATUS_CHOICES
             ],
-            'jobs_performance': list(jobs_performance)
+            'jobs_performance': jobs_performance,
+            'applications_over_time': list(applications_over_time),
         })
 
-class JobVacancyViewSet(viewsets.ModelViewSet):
-    queryset = JobVacancy.objects.all()
+    @action(detail=False, methods=['get'])
+    def export_applicants(self, request):
+        """
+        Export every applicant across all of the shop's jobs in one pass.
+
+        ?file_format=csv|ndjson|xlsx (csv by default), ?status=PENDING,SHORTLISTED,
+        ?applied_after= / ?applied_before= (ISO dates or datetimes) and, for
+        csv and ndjson, ?compress=gzip. csv and ndjson are streamed; xlsx is
+        sent once the whole workbook is built.
+        """
+        shop = request.user.shop_profile
+        applications = JobApplication.objects.filter(job__shop=shop)
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in exports.CONTENT_TYPES:
+            return Response({'detail': 'file_format must be one of: csv, ndjson, xlsx.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+        valid_statuses = {code for code, _ in JobApplication.STATUS_CHOICES}
+        if not set(statuses) <= valid_statuses:
+            return Response({'detail': f'Unknown status. Choose from: {", ".join(sorted(valid_statuses))}.'}, status=status.HTTP_400_BAD_REQUEST)
+        if statuses:
+            applications = applications.filter(status__in=statuses)
+
+        for param, lookup in (('applied_after', 'applied_at__gte'), ('applied_before', 'applied_at__lt')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            moment = parse_moment(value)
+            if moment is None:
+                return Response({'detail': f'{param} must be an ISO date or datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+            applications = applications.filter(**{lookup: moment})
+
+        columns = exports.SHOP_APPLICANT_COLUMNS
+        rows = exports.iter_rows(applications.order_by('job_id', 'id'), columns)
+        filename = f'applicants_shop_{shop.id}.{file_format}'
+        if file_format == 'xlsx':
+            return exports.xlsx_download(columns, rows, filename)
+        chunks = exports.iter_csv(columns, rows) if file_format == 'csv' else exports.iter_ndjson(columns, rows)
+        return exports.streaming_download(
+            chunks,
+            filename=filename,
+            content_type=exports.CONTENT_TYPES[file_format],
+            compress=request.query_params.get('compress') == 'gzip',
+        )
+
+class JobVacancyViewSet(CachedReadMixin, viewsets.ModelViewSet):
+    queryset = JobVacancy.objects.select_related('shop__user')
     serializer_class = JobVacancySerializer
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = JobCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            params = self.request.query_params
+            # Inactive postings are excluded here unless ?is_active= says otherwise
+            queryset = filter_vacancies(queryset, params)
+            if params.get('q'):
+                queryset = search.search_vacancies(queryset, params['q'])
+            if params.get('near'):
+                queryset = filter_near(queryset, params, prefix='shop__')
+            if params.get('ordering'):
+                queryset = queryset.order_by(*vacancy_ordering(params))
+        return queryset
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            # Search and distance results are ordered by rank rather than
+            # creation time, so they are paged by offset
+            params = self.request.query_params
+            if params.get('q') or params.get('near'):
+                self._paginator = RankedResultsPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_serializer_class(self):
+        # The feed serves compact cards by default; ?view=full restores the
+        # complete representation including the comment tree.
+        if self.action == 'list' and self.request.query_params.get('view') != 'full':
+            return JobVacancyCardSerializer
+        return super().get_serializer_class()
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -135,13 +286,21 @@ class JobVacancyViewSet(viewsets.ModelViewSet):
         shop = self.request.user.shop_profile
         serializer.save(shop=shop)
         
+    def list(self, request, *args, **kwargs):
+        dependencies = [('jobs',)]
+        if request.query_params.get('view') == 'full':
+            dependencies.append(('comments',))
+        return self.cached_read(request, dependencies, partial(super().list, request, *args, **kwargs))
+
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        pk = kwargs['pk']
+        response = self.cached_read(
+            request, [('job', pk), ('shops',)], partial(super().retrieve, request, *args, **kwargs)
+        )
+        # Views are buffered and written back in batches by the counter
+        if response.status_code in (200, 304) and str(pk).isdigit():
+            view_counter.increment(int(pk))
+        return response
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def apply(self, request, pk=None):
@@ -163,10 +322,45 @@ class JobVacancyViewSet(viewsets.ModelViewSet):
             if not serializer.validated_data.get('meets_requirements', False):
                 return Response({'detail': 'You must declare that you meet the requirements.'}, status=status.HTTP_400_BAD_REQUEST)
                 
-            serializer.save(applicant=user, job=job)
+            # New CVs are copied to their storage by a background task; a CV
+            # stored before is linked without uploading it again
+            cv = request.FILES.get('cv')
+            if cv is not None and not cv.size:
+                return Response({'detail': 'The submitted CV is empty.'}, status=status.HTTP_400_BAD_REQUEST)
+            upload_id = request.data.get('cv_upload')
+            stored_cv_id = request.data.get('stored_cv')
+            if sum(1 for source in (cv, upload_id, stored_cv_id) if source) > 1:
+                return Response({'detail': 'Send only one of a CV file, cv_upload or stored_cv.'}, status=status.HTTP_400_BAD_REQUEST)
+            stored_cv = None
+            if stored_cv_id:
+                stored_cv = cvstore.owned_by(user).filter(pk=stored_cv_id if str(stored_cv_id).isdigit() else None).first()
+                if stored_cv is None:
+                    return Response({'detail': 'stored_cv must be one of your CVs.'}, status=status.HTTP_400_BAD_REQUEST)
+            with transaction.atomic():
+                if upload_id:
+                    # A finalized chunked upload can be used for one application
+                    upload = self._complete_upload(user, upload_id)
+                    if upload is None:
+                        return Response({'detail': 'cv_upload must be one of your finalized uploads.'}, status=status.HTTP_400_BAD_REQUEST)
+                application = serializer.save(applicant=user, job=job)
+                if cv:
+                    tasks.stage_cv(application, cv)
+                elif upload_id:
+                    tasks.store_staged_cv(application, upload.staged_name, upload.filename, upload.digest)
+                elif stored_cv:
+                    cvstore.attach(application, stored_cv, stored_cv.own_filename)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @staticmethod
+    def _complete_upload(user, upload_id):
+        try:
+            upload_id = uuid.UUID(str(upload_id))
+        except ValueError:
+            return None
+        claimed = CVUpload.objects.filter(pk=upload_id, user=user, status='COMPLETE').update(status='USED')
+        return CVUpload.objects.get(pk=upload_id) if claimed else None
+
     @action(detail=True, methods=['post'], permission_classes=[IsVerifiedShopOwner])
     def bulk_reject_pending(self, request, pk=None):
         job = self.get_object()
@@ -183,9 +377,8 @@ class JobVacancyViewSet(viewsets.ModelViewSet):
             job=job, 
             status__in=['PENDING', 'SHORTLISTED']
         )
-        
-        count = applications_to_reject.count()
-        applications_to_reject.update(status='REJECTED', owner_note=owner_note)
+        outcomes = transitions.apply_status(applications_to_reject, 'REJECTED', owner_note)
+        count = len(outcomes)
         
         return Response({'detail': f'Successfully rejected {count} applicants.', 'count': count}, status=status.HTTP_200_OK)
 
@@ -198,26 +391,15 @@ class JobVacancyViewSet(viewsets.ModelViewSet):
         if getattr(user, 'shop_profile', None) != job.shop:
             return Response({'detail': 'Not permitted.'}, status=status.HTTP_403_FORBIDDEN)
             
-        applications = JobApplication.objects.filter(job=job).select_related('applicant')
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="applicants_job_{job.id}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Email', 'Mobile Number', 'Status', 'Applied Date', 'Meets Requirements', 'Applicant Notes'])
-        
-        for app in applications:
-            writer.writerow([
-                app.applicant.username,
-                app.applicant.email,
-                app.applicant.mobile_number,
-                app.status,
-                app.applied_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'Yes' if app.meets_requirements else 'No',
-                app.notes
-            ])
-            
-        return response
+        # ?compress=gzip streams a gzip-compressed file instead
+        applications = JobApplication.objects.filter(job=job).order_by('id')
+        rows = exports.iter_rows(applications, exports.APPLICANT_COLUMNS)
+        return exports.streaming_download(
+            exports.iter_csv(exports.APPLICANT_COLUMNS, rows),
+            filename=f'applicants_job_{job.id}.csv',
+            content_type='text/csv',
+            compress=request.query_params.get('compress') == 'gzip',
+        )
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def comment(self, request, pk=None):
@@ -232,22 +414,223 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
     parser_classes = (MultiPartParser, FormParser, JSONParser) # to handle file uploads and JSON updates
+    pagination_class = ApplicationCursorPagination
 
     def get_permissions(self):
+        if self.action == 'bulk_update_status':
+            return [IsVerifiedShopOwner()]
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
         user = self.request.user
+        queryset = JobApplication.objects.select_related('job__shop', 'applicant')
+        if self.get_serializer_class() is JobApplicationSerializer:
+            # The full representation also nests the shop owner
+            queryset = queryset.select_related('job__shop__user')
         if user.role == 'SHOP_OWNER':
-            return JobApplication.objects.filter(job__shop__user=user)
-        return JobApplication.objects.filter(applicant=user)
+            return queryset.filter(job__shop__user=user)
+        return queryset.filter(applicant=user)
+
+    def get_serializer_class(self):
+        # Lists reference jobs by id by default; ?view=full nests each vacancy
+        if self.action == 'list' and self.request.query_params.get('view') != 'full':
+            return JobApplicationCompactSerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        if serializer.child.__class__ is JobApplicationCompactSerializer:
+            # Each distinct job is serialized once, however many applications reference it
+            jobs = {application.job_id: application.job for application in page}
+            response.data['jobs'] = JobVacancyCardSerializer(jobs.values(), many=True).data
+        return response
 
     def perform_create(self, serializer):
         # Prevent direct creation via this endpoint, use job apply action instead
         pass
 
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Set ``status`` (and optionally ``owner_note``) on many applications
+        to the owner's jobs at once, selected by ``ids`` or by a ``filter``
+        of ``{"job": <id>, "status": [...]}``. Returns the outcome per id.
+        """
+        new_status = request.data.get('status')
+        valid_statuses = {code for code, _ in JobApplication.STATUS_CHOICES}
+        if new_status not in valid_statuses:
+            return Response({'detail': f'status must be one of: {", ".join(sorted(valid_statuses))}.'}, status=status.HTTP_400_BAD_REQUEST)
+        owner_note = request.data.get('owner_note')
+        if owner_note is not None and not isinstance(owner_note, str):
+            return Response({'detail': 'owner_note must be a string.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = request.data.get('ids')
+        selection = request.data.get('filter')
+        if (ids is None) == (selection is None):
+            return Response({'detail': 'Send either ids or filter.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = JobApplication.objects.filter(job__shop__user=request.user)
+        if ids is not None:
+            if not isinstance(ids, list) or not all(_is_id(pk) for pk in ids):
+                return Response({'detail': 'ids must be a list of application ids.'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > transitions.MAX_BULK_IDS:
+                return Response({'detail': f'At most {transitions.MAX_BULK_IDS} ids can be updated at once.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(pk__in=ids)
+        else:
+            # An unknown key would otherwise widen the update to every application
+            if (
+                not isinstance(selection, dict) or not set(selection) <= {'job', 'status'}
+                or all(selection.get(key) is None for key in ('job', 'status'))
+            ):
+                return Response({'detail': 'filter must be an object with job and/or status.'}, status=status.HTTP_400_BAD_REQUEST)
+            job_id = selection.get('job')
+            if job_id is not None:
+                if not _is_id(job_id):
+                    return Response({'detail': 'filter.job must be a job id.'}, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(job_id=job_id)
+            statuses = selection.get('status')
+            if statuses is not None:
+                statuses = [statuses] if isinstance(statuses, str) else statuses
+                if not isinstance(statuses, list) or not all(isinstance(code, str) and code in valid_statuses for code in statuses):
+                    return Response({'detail': 'filter.status must be a status or a list of statuses.'}, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(status__in=statuses)
+
+        try:
+            # A filter may match any number of applications
+            outcomes = transitions.apply_status(queryset, new_status, owner_note, limit=transitions.MAX_BULK_IDS)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        results = [
+            {'id': pk, 'outcome': outcome, 'previous_status': previous}
+            for pk, (outcome, previous) in outcomes.items()
+        ]
+        if ids is not None:
+            # Ids that do not exist or belong to another shop are reported alike
+            results += [{'id': pk, 'outcome': 'not_found'} for pk in dict.fromkeys(ids) if pk not in outcomes]
+        updated = sum(1 for outcome, _ in outcomes.values() if outcome == 'updated')
+        return Response({'updated': updated, 'results': results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        A seeker's applications as flat rows, read with one joined query.
+        ``?since=`` limits them to applications changed after that moment;
+        pass back ``latest`` from the previous response to poll for changes.
+        """
+        if request.user.role != 'JOB_SEEKER':
+            return Response({'detail': 'Only job seekers have an application summary.'}, status=status.HTTP_403_FORBIDDEN)
+        queryset = JobApplication.objects.filter(applicant=request.user)
+        since = request.query_params.get('since')
+        if since:
+            moment = parse_moment(since)
+            if moment is None:
+                return Response({'detail': 'since must be an ISO date or datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(updated_at__gt=moment)
+        rows = list(
+            queryset.order_by('-updated_at', '-id').values(
+                'id', 'job_id', 'status', 'updated_at',
+                job_title=F('job__title'), shop_name=F('job__shop__company_name'),
+            )
+        )
+
+        digest = hashlib.md5(repr((since, rows)).encode(), usedforsecurity=False).hexdigest()
+        etag = quote_etag(digest)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        latest = rows[0]['updated_at'] if rows else (moment if since else None)
+        response = Response({'latest': latest, 'results': rows})
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def my_cvs(self, request):
+        # CVs the seeker applied with before; pass one's id as stored_cv to apply
+        cvs = cvstore.owned_by(request.user).order_by('-created_at')
+        return Response(StoredCVSerializer(cvs, many=True).data)
+
+class CVUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable CV uploads: create with filename, content_type and size, PUT
+    the bytes to ``chunk/?offset=<received>`` until complete, then
+    ``finalize/``. GET returns how much was received, to resume from.
+    """
+    serializer_class = CVUploadSerializer
+    parser_classes = (JSONParser, FormParser)
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return CVUpload.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        if request.user.role != 'JOB_SEEKER':
+            return Response({'detail': 'Only job seekers can upload CVs.'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        error = uploads.validate_declaration(data['filename'], data['content_type'], data['size'])
+        if error:
+            return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+        upload = serializer.save(user=request.user)
+        uploads.create_staging_file(upload)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        upload = self.get_object()
+        if upload.status != 'UPLOADING':
+            return Response({'detail': 'Upload is already finalized.'}, status=status.HTTP_400_BAD_REQUEST)
+        offset = request.query_params.get('offset', '')
+        if not offset.isdigit():
+            return Response({'detail': 'offset must be a non-negative integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        offset = int(offset)
+        if offset != upload.received:
+            return Response(
+                {'detail': 'offset must equal the number of bytes received.', 'received': upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # The body is read straight from the request stream, never parsed
+        written = uploads.write_chunk(upload, offset, request.stream or io.BytesIO())
+        if written is None:
+            return Response(
+                {'detail': f'Chunks are limited to {uploads.max_chunk_size()} bytes and may not exceed the declared size.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if not CVUpload.objects.filter(pk=upload.pk, received=offset, status='UPLOADING').update(received=offset + written):
+            upload.refresh_from_db()
+            return Response(
+                {'detail': 'Upload changed concurrently.', 'received': upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        upload.received = offset + written
+        return Response(self.get_serializer(upload).data)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        upload = self.get_object()
+        if upload.status != 'UPLOADING':
+            return Response(self.get_serializer(upload).data)
+        if upload.received != upload.size:
+            return Response(
+                {'detail': 'Upload is incomplete.', 'received': upload.received},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not uploads.matches_signature(upload):
+            uploads.discard(upload)
+            upload.delete()
+            return Response({'detail': 'File content does not match its type.'}, status=status.HTTP_400_BAD_REQUEST)
+        upload.digest = uploads.content_digest(upload)
+        CVUpload.objects.filter(pk=upload.pk, status='UPLOADING').update(status='COMPLETE', digest=upload.digest)
+        upload.status = 'COMPLETE'
+        return Response(self.get_serializer(upload).data)
+
 class VacancyCommentViewSet(viewsets.ModelViewSet):
-    queryset = VacancyComment.objects.all()
+    queryset = VacancyComment.objects.select_related('user')
     serializer_class = VacancyCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
 